@@ -0,0 +1,89 @@
+import argparse
+import json
+import sys
+
+from benchmark.corpus import CorpusConfig
+from benchmark.memory import measure_memory
+from benchmark.rendering import compare_rendering
+from benchmark.suite import run_benchmark
+
+
+def parse_args(argv):
+    defaults = CorpusConfig()
+    parser = argparse.ArgumentParser(
+        description="Benchmark the site build on generated content"
+    )
+    parser.add_argument(
+        "--pages",
+        default="10,100,1000",
+        help="comma separated page counts, one benchmark run each",
+    )
+    parser.add_argument("--page-size", type=int, default=defaults.page_size)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--list-density", type=float, default=defaults.list_density)
+    parser.add_argument("--code-density", type=float, default=defaults.code_density)
+    parser.add_argument("--link-density", type=float, default=defaults.link_density)
+    parser.add_argument("--images", type=int, default=defaults.images)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("--template", default="template.html")
+    parser.add_argument(
+        "--memory",
+        type=float,
+        metavar="MB",
+        help="instead measure node memory while parsing one document of this size",
+    )
+    parser.add_argument(
+        "--rendering",
+        type=float,
+        metavar="MB",
+        help="instead compare iterative and recursive rendering on a document "
+        "of this size and on a nested list",
+    )
+    parser.add_argument(
+        "--nesting",
+        type=int,
+        default=2000,
+        help="nesting depth of the list used by --rendering",
+    )
+    parser.add_argument("-o", "--output", help="write the JSON report to a file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.memory:
+        result = measure_memory(int(args.memory * 1e6), args.seed)
+        write_report({"memory": result}, args.output)
+        return
+    if args.rendering:
+        result = compare_rendering(int(args.rendering * 1e6), args.nesting, args.seed)
+        write_report({"rendering": result}, args.output)
+        return
+    results = []
+    for pages in [int(count) for count in args.pages.split(",")]:
+        config = CorpusConfig(
+            pages=pages,
+            page_size=args.page_size,
+            depth=args.depth,
+            list_density=args.list_density,
+            code_density=args.code_density,
+            link_density=args.link_density,
+            images=args.images,
+            seed=args.seed,
+        )
+        results.append(run_benchmark(config, args.template, args.jobs))
+    write_report({"runs": results}, args.output)
+
+
+def write_report(results, output=None):
+    report = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
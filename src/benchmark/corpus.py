@@ -0,0 +1,114 @@
+import os
+import random
+
+WORDS = (
+    "the ring of power was forged in the fires of mount doom by sauron "
+    "while elves dwarves and men received rings of their own in rivendell "
+    "gandalf bilbo frodo sam merry pippin aragorn legolas gimli boromir"
+).split()
+
+
+class CorpusConfig:
+    def __init__(
+        self,
+        pages=100,
+        page_size=4000,
+        depth=2,
+        list_density=0.2,
+        code_density=0.1,
+        link_density=0.1,
+        images=10,
+        seed=0,
+    ):
+        self.pages = pages
+        self.page_size = page_size
+        self.depth = depth
+        self.list_density = list_density
+        self.code_density = code_density
+        self.link_density = link_density
+        self.images = images
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def generate_corpus(root, config):
+    # writes root/content and root/static/images, returns the total
+    # number of markdown bytes written
+    rng = random.Random(config.seed)
+    content_dir = os.path.join(root, "content")
+    image_dir = os.path.join(root, "static", "images")
+    os.makedirs(image_dir, exist_ok=True)
+    for i in range(config.images):
+        with open(os.path.join(image_dir, f"image{i}.png"), "wb") as f:
+            f.write(rng.randbytes(1024))
+    paths = [page_path(i, config.depth) for i in range(config.pages)]
+    total = 0
+    for path in paths:
+        md = generate_page(rng, config, paths)
+        dest = os.path.join(content_dir, path, "index.md")
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(dest, "w") as f:
+            f.write(md)
+        total += len(md.encode())
+    return total
+
+
+def page_path(index, depth):
+    # spreads pages over a tree of `depth` directory levels, ten per level
+    parts = [f"section{index // 10 ** level % 10}" for level in range(depth, 0, -1)]
+    return os.path.join(*parts, f"page{index}")
+
+
+def generate_page(rng, config, paths):
+    blocks = [f"# {sentence(rng, config, paths, 3, 8, inline=False)}"]
+    size = len(blocks[0])
+    while size < config.page_size:
+        roll = rng.random()
+        if roll < config.code_density:
+            block = (
+                "```\n"
+                + "\n".join(
+                    sentence(rng, config, paths, 3, 10, inline=False)
+                    for _ in range(rng.randint(2, 10))
+                )
+                + "\n```"
+            )
+        elif roll < config.code_density + config.list_density:
+            if rng.random() < 0.5:
+                lines = [
+                    f"- {sentence(rng, config, paths, 3, 12)}"
+                    for _ in range(rng.randint(2, 8))
+                ]
+            else:
+                lines = [
+                    f"{n}. {sentence(rng, config, paths, 3, 12)}"
+                    for n in range(1, rng.randint(3, 9))
+                ]
+            block = "\n".join(lines)
+        elif roll < 0.05 + config.code_density + config.list_density:
+            block = f"## {sentence(rng, config, paths, 2, 6, inline=False)}"
+        elif config.images and rng.random() < 0.1:
+            image = rng.randrange(config.images)
+            block = f"![image {image}](/images/image{image}.png)"
+        else:
+            block = "\n".join(
+                sentence(rng, config, paths, 8, 30) for _ in range(rng.randint(1, 5))
+            )
+        blocks.append(block)
+        size += len(block) + 2
+    return "\n\n".join(blocks) + "\n"
+
+
+def sentence(rng, config, paths, low, high, inline=True):
+    words = []
+    for _ in range(rng.randint(low, high)):
+        word = rng.choice(WORDS)
+        if inline and rng.random() < config.link_density:
+            target = rng.choice(paths).replace(os.sep, "/")
+            word = f"[{word}](/{target})"
+        elif inline and rng.random() < 0.05:
+            word = rng.choice([f"**{word}**", f"_{word}_", f"`{word}`"])
+        words.append(word)
+    return " ".join(words)
@@ -0,0 +1,71 @@
+import multiprocessing
+import random
+import resource
+import sys
+import tracemalloc
+
+from benchmark.corpus import CorpusConfig, generate_page
+from build.profile import PageProfile
+from html.textNodeToHtmlNode import block_node_to_html_node
+from markdown.parse_block_markdown import block_to_block_node, markdown_to_blocks
+
+
+def generate_document(size, seed=0):
+    config = CorpusConfig(pages=1, page_size=size, images=10, seed=seed)
+    return generate_page(random.Random(seed), config, ["page0"])
+
+
+def parse_document(markdown):
+    block_nodes = [block_to_block_node(block) for block in markdown_to_blocks(markdown)]
+    html_nodes = [block_node_to_html_node(node) for node in block_nodes]
+    return block_nodes, html_nodes
+
+
+def node_size(node):
+    size = sys.getsizeof(node)
+    if hasattr(node, "__dict__"):
+        size += sys.getsizeof(node.__dict__)
+    return size
+
+
+def measure_memory(size, seed=0):
+    markdown = generate_document(size, seed)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        block_nodes, html_nodes = parse_document(markdown)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    counts = PageProfile(None)
+    counts.count_nodes(block_nodes)
+    counts.count_nodes(html_nodes)
+    nodes = sum(counts.counts.values())
+    samples = {}
+    stack = list(block_nodes) + list(html_nodes)
+    while stack and len(samples) < len(counts.counts):
+        node = stack.pop()
+        samples.setdefault(type(node).__name__, node_size(node))
+        stack.extend(getattr(node, "children", None) or [])
+    return {
+        "markdown_bytes": len(markdown.encode()),
+        "nodes": counts.counts,
+        "bytes_per_node": (retained - before) / nodes,
+        "instance_bytes": samples,
+        "retained_bytes": retained - before,
+        "peak_traced_bytes": peak - before,
+        "max_rss_bytes": measure_peak_rss(markdown),
+    }
+
+
+def measure_peak_rss(markdown):
+    # a fresh process, so earlier allocations do not mask the parse's peak
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(_parse_and_report_rss, (markdown,))
+
+
+def _parse_and_report_rss(markdown):
+    parse_document(markdown)
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
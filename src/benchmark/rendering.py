@@ -0,0 +1,101 @@
+import sys
+import time
+
+from benchmark.memory import generate_document
+from html.leafnode import LeafNode
+from html.parentnode import ParentNode
+from html.textNodeToHtmlNode import block_node_to_html_node, text_node_to_html_node
+from markdown.parse_block_markdown import block_to_block_node, markdown_to_blocks
+from node.blocknode import BlockNode, BlockType
+from node.textnode import TextNode, TextType
+
+
+def recursive_to_html(node):
+    # the recursive serializer ParentNode.to_html used to be
+    if not isinstance(node, ParentNode):
+        return node.to_html()
+    children_html = "".join([recursive_to_html(child) for child in node.children])
+    return f"<{node.tag}{node.props_to_html()}>{children_html}</{node.tag}>"
+
+
+def recursive_block_node_to_html_node(block_node):
+    if block_node.block_type == BlockType.CODE:
+        return ParentNode(
+            "pre",
+            ParentNode("code", LeafNode(None, block_node.children[0].text + "\n")),
+        )
+    if block_node.block_type in [BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST]:
+        children = [
+            recursive_block_node_to_html_node(child) for child in block_node.children
+        ]
+    else:
+        children = [text_node_to_html_node(child) for child in block_node.children]
+    tag = {
+        BlockType.QUOTE: "blockquote",
+        BlockType.UNORDERED_LIST: "ul",
+        BlockType.ORDERED_LIST: "ol",
+        BlockType.UNORDERED_LIST_ITEM: "li",
+        BlockType.ORDERED_LIST_ITEM: "li",
+    }.get(block_node.block_type)
+    if tag is None and block_node.block_type.value.startswith("heading"):
+        tag = "h" + block_node.block_type.value[-1]
+    return ParentNode(tag or "p", children)
+
+
+def nested_list(depth):
+    node = BlockNode([TextNode("leaf", TextType.TEXT)], BlockType.UNORDERED_LIST_ITEM)
+    for _ in range(depth):
+        item = BlockNode(
+            [TextNode("item", TextType.TEXT)], BlockType.UNORDERED_LIST_ITEM
+        )
+        node = BlockNode([item, node], BlockType.UNORDERED_LIST)
+    return node
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def compare(label, block_nodes):
+    iterative_convert, iterative = timed(
+        lambda: [block_node_to_html_node(node) for node in block_nodes]
+    )
+    recursive_convert, recursive = timed(
+        lambda: [recursive_block_node_to_html_node(node) for node in block_nodes]
+    )
+    iterative_render, iterative_html = timed(
+        lambda: "".join(node.to_html() for node in iterative)
+    )
+    recursive_render, recursive_html = timed(
+        lambda: "".join(recursive_to_html(node) for node in recursive)
+    )
+    if iterative_html != recursive_html:
+        raise AssertionError(f"{label}: iterative and recursive output differ")
+    return {
+        "output_bytes": len(iterative_html),
+        "convert_seconds": {
+            "iterative": iterative_convert,
+            "recursive": recursive_convert,
+        },
+        "render_seconds": {
+            "iterative": iterative_render,
+            "recursive": recursive_render,
+        },
+    }
+
+
+def compare_rendering(size, depth, seed=0):
+    markdown = generate_document(size, seed)
+    block_nodes = [block_to_block_node(block) for block in markdown_to_blocks(markdown)]
+    result = {"document": compare("document", block_nodes)}
+    # the recursive versions need about two frames per nesting level
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, 4 * depth + 1000))
+    try:
+        result["nested"] = compare("nested", [nested_list(depth)])
+    finally:
+        sys.setrecursionlimit(limit)
+    result["nested"]["depth"] = depth
+    return result
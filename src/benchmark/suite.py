@@ -0,0 +1,123 @@
+import contextlib
+import io
+import os
+import resource
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import main
+from benchmark.corpus import generate_corpus
+from html.textNodeToHtmlNode import block_node_to_html_node
+from markdown.parse_block_markdown import block_to_block_node, markdown_to_blocks
+
+STAGES = [
+    "markdown_to_blocks",
+    "block_to_block_node",
+    "block_node_to_html_node",
+    "to_html",
+    "write",
+]
+
+
+def run_benchmark(config, template_path, jobs=1, keep=False):
+    root = tempfile.mkdtemp(prefix="ssg-bench-")
+    try:
+        corpus_bytes = generate_corpus(root, config)
+        shutil.copy(template_path, os.path.join(root, "template.html"))
+        sources = [
+            path for path, _ in main.collect_pages(os.path.join(root, "content"), "")
+        ]
+        markdown = []
+        for path in sources:
+            with open(path, "r") as f:
+                markdown.append(f.read())
+        out_dir = os.path.join(root, "stage_output")
+        result = {
+            "config": config.to_dict(),
+            "pages": len(sources),
+            "markdown_bytes": corpus_bytes,
+            "stages": measure_stages(markdown, out_dir, corpus_bytes),
+            "build": measure_build(root, len(sources), corpus_bytes, jobs),
+        }
+    finally:
+        if not keep:
+            shutil.rmtree(root)
+    return result
+
+
+def run_stages(markdown, out_dir):
+    # yields (stage, output size) once each stage has processed every page
+    blocks = [markdown_to_blocks(md) for md in markdown]
+    yield "markdown_to_blocks", None
+    block_nodes = [[block_to_block_node(block) for block in page] for page in blocks]
+    del blocks
+    yield "block_to_block_node", None
+    html_nodes = [
+        [block_node_to_html_node(node) for node in page] for page in block_nodes
+    ]
+    del block_nodes
+    yield "block_node_to_html_node", None
+    html = ["".join(node.to_html() for node in page) for page in html_nodes]
+    del html_nodes
+    yield "to_html", sum(len(page) for page in html)
+    os.makedirs(out_dir, exist_ok=True)
+    for i, page in enumerate(html):
+        with open(os.path.join(out_dir, f"{i}.html"), "w") as f:
+            f.write(page)
+    yield "write", None
+
+
+def measure_stages(markdown, out_dir, corpus_bytes):
+    stages = {}
+    start = time.perf_counter()
+    for stage, output_bytes in run_stages(markdown, out_dir):
+        end = time.perf_counter()
+        stages[stage] = rates(end - start, len(markdown), corpus_bytes)
+        stages[stage]["max_rss_bytes"] = max_rss_bytes()
+        if output_bytes is not None:
+            stages[stage]["output_bytes"] = output_bytes
+        start = time.perf_counter()
+    # tracemalloc slows allocation down, so memory gets its own pass
+    tracemalloc.start()
+    try:
+        for stage, _ in run_stages(markdown, out_dir):
+            stages[stage]["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+    finally:
+        tracemalloc.stop()
+    return stages
+
+
+def measure_build(root, pages, corpus_bytes, jobs):
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            main.main(["/", "--jobs", str(jobs)])
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            main.main(["/", "--jobs", str(jobs)])
+            warm = time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+    result = rates(cold, pages, corpus_bytes)
+    result["jobs"] = jobs
+    result["max_rss_bytes"] = max_rss_bytes()
+    result["unchanged_rebuild_seconds"] = warm
+    return result
+
+
+def rates(seconds, pages, corpus_bytes):
+    return {
+        "seconds": seconds,
+        "pages_per_sec": pages / seconds if seconds else None,
+        "mb_per_sec": corpus_bytes / 1e6 / seconds if seconds else None,
+    }
+
+
+def max_rss_bytes():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
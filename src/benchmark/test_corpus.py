@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+from benchmark.corpus import CorpusConfig, generate_corpus, page_path
+from markdown.parse_block_markdown import extract_title
+from node.markdownToHtmlNode import markdown_to_html_node
+
+
+class TestCorpus(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def read_pages(self, root):
+        pages = {}
+        for dirpath, _, filenames in os.walk(os.path.join(root, "content")):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, "r") as f:
+                    pages[os.path.relpath(path, root)] = f.read()
+        return pages
+
+    def test_page_path(self):
+        self.assertEqual(
+            page_path(123, 2), os.path.join("section1", "section2", "page123")
+        )
+        self.assertEqual(page_path(7, 0), "page7")
+
+    def test_generated_pages_parse(self):
+        config = CorpusConfig(pages=20, page_size=2000, images=3)
+        total = generate_corpus(self.tmp.name, config)
+        pages = self.read_pages(self.tmp.name)
+        self.assertEqual(len(pages), 20)
+        self.assertEqual(total, sum(len(md.encode()) for md in pages.values()))
+        self.assertEqual(
+            len(os.listdir(os.path.join(self.tmp.name, "static", "images"))), 3
+        )
+        for md in pages.values():
+            self.assertGreaterEqual(len(md), 2000)
+            extract_title(md)
+            markdown_to_html_node(md).to_html()
+
+    def test_generation_is_deterministic(self):
+        config = CorpusConfig(pages=5, page_size=1000, seed=7)
+        first = os.path.join(self.tmp.name, "first")
+        second = os.path.join(self.tmp.name, "second")
+        generate_corpus(first, config)
+        generate_corpus(second, config)
+        self.assertEqual(self.read_pages(first), self.read_pages(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
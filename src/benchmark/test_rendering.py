@@ -0,0 +1,14 @@
+import unittest
+
+from benchmark.rendering import compare_rendering
+
+
+class TestRendering(unittest.TestCase):
+    def test_iterative_matches_recursive(self):
+        result = compare_rendering(20_000, 50)
+        self.assertGreater(result["document"]["output_bytes"], 20_000)
+        self.assertEqual(result["nested"]["depth"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
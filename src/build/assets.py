@@ -0,0 +1,78 @@
+import os
+import shutil
+
+from build.fingerprint import fingerprinted_name
+from build.manifest import hash_file
+from build.output import temp_path
+
+
+def sync_folder(
+    src, dest, manifest=None, link=False, checksum=False, fingerprints=None
+):
+    # fingerprints: {path: content hash} from fingerprint_folder, to copy
+    # each file to its fingerprinted name
+    copied = []
+    for dirpath, dirnames, filenames in os.walk(src):
+        dirnames.sort()
+        dest_dir = os.path.join(dest, os.path.relpath(dirpath, src))
+        os.makedirs(dest_dir, exist_ok=True)
+        for filename in sorted(filenames):
+            s = os.path.join(dirpath, filename)
+            d = os.path.normpath(os.path.join(dest_dir, filename))
+            if fingerprints is not None:
+                d = fingerprinted_name(d, fingerprints[s])
+            if needs_copy(s, d, checksum):
+                copy_file(s, d, link)
+                copied.append(d)
+            if manifest is not None:
+                manifest.record_asset(s, d)
+    return copied
+
+
+def needs_copy(src, dest, checksum=False):
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        return True
+    src_stat = os.stat(src)
+    if os.path.samestat(src_stat, dest_stat):
+        return False
+    if src_stat.st_size != dest_stat.st_size:
+        return True
+    if checksum:
+        return hash_file(src) != hash_file(dest)
+    return src_stat.st_mtime_ns != dest_stat.st_mtime_ns
+
+
+def copy_file(src, dest, link=False):
+    # copied to a temp file renamed over dest, so dest is never seen half
+    # written and never written through: it may be a hardlink to src
+    if link and os.path.exists(dest) and os.path.samefile(src, dest):
+        return
+    tmp_path = temp_path(dest)
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    if link:
+        try:
+            os.link(src, tmp_path)
+            os.replace(tmp_path, dest)
+            return
+        except OSError:
+            pass
+    try:
+        _copy_file_range(src, tmp_path)
+    except (AttributeError, OSError):
+        # shutil.copyfile uses sendfile() on Linux
+        shutil.copyfile(src, tmp_path)
+    shutil.copystat(src, tmp_path)
+    os.replace(tmp_path, dest)
+
+
+def _copy_file_range(src, dest):
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
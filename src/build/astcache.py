@@ -0,0 +1,120 @@
+import os
+import pickle
+from collections import OrderedDict
+
+from build.manifest import hash_bytes
+from markdown import metadata, parse_block_markdown, parse_inline_markdown
+from node import blocknode, textnode
+
+CACHE_DIR = os.path.join(".build_cache", "ast")
+DEFAULT_MAX_BYTES = 256 << 20
+
+# a cached tree is only as good as the code that parsed it, so the
+# parser's own source is part of every key; metadata strips the front
+# matter before parsing
+PARSER_MODULES = [
+    metadata,
+    parse_block_markdown,
+    parse_inline_markdown,
+    blocknode,
+    textnode,
+]
+
+
+def parser_version():
+    sources = b""
+    for module in PARSER_MODULES:
+        with open(module.__file__, "rb") as f:
+            sources += f.read()
+    return hash_bytes(sources)[:16]
+
+
+class AstCache:
+    # parsed block node lists pickled one file per source hash; reading an
+    # entry bumps its mtime, so evict() drops the least recently used first.
+    # A long-running process may also keep the last memory_entries lists
+    # unpickled in memory
+    def __init__(
+        self, directory=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, memory_entries=0
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.memory = OrderedDict()
+        self.version = parser_version()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # worker processes get their own, empty memory
+        state = dict(self.__dict__)
+        state["memory"] = OrderedDict()
+        return state
+
+    def entry_path(self, source_hash):
+        return os.path.join(self.directory, f"{source_hash}-{self.version}.pickle")
+
+    def get(self, source_hash):
+        if source_hash in self.memory:
+            self.memory.move_to_end(source_hash)
+            self.hits += 1
+            return self.memory[source_hash]
+        path = self.entry_path(source_hash)
+        try:
+            with open(path, "rb") as f:
+                block_nodes = pickle.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            # a damaged entry is just a miss, the next put replaces it
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.remember(source_hash, block_nodes)
+        return block_nodes
+
+    def remember(self, source_hash, block_nodes):
+        if not self.memory_entries:
+            return
+        self.memory[source_hash] = block_nodes
+        if len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def put(self, source_hash, block_nodes):
+        self.remember(source_hash, block_nodes)
+        path = self.entry_path(source_hash)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(block_nodes, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def evict(self):
+        # returns the number of entries removed
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        entries = []
+        total = 0
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
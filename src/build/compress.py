@@ -0,0 +1,91 @@
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from build.output import temp_path
+
+COMPRESSED_TYPES = (".html", ".css", ".js", ".svg")
+# a .gz must come out at least this much smaller than its file to be kept
+MAX_RATIO = 0.9
+
+
+def compressed_path(path):
+    return path + ".gz"
+
+
+def is_current(path):
+    # a .gz carries the mtime of the file it was made from
+    try:
+        return os.stat(compressed_path(path)).st_mtime_ns == os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def was_rejected(path, rejected):
+    # rejected maps files that did not compress well enough to their mtime
+    return rejected.get(path) == os.stat(path).st_mtime_ns
+
+
+def compress_outputs(paths, level=9, jobs=1, rejected=None):
+    # returns the files a .gz was written for; rejected is updated, so a
+    # file is not tried again until it changes
+    if rejected is None:
+        rejected = {}
+    pending = [
+        path
+        for path in paths
+        if path.endswith(COMPRESSED_TYPES)
+        and not is_current(path)
+        and not was_rejected(path, rejected)
+    ]
+    levels = [level] * len(pending)
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            chunksize = max(1, len(pending) // (jobs * 4))
+            written = list(
+                executor.map(compress_file, pending, levels, chunksize=chunksize)
+            )
+    else:
+        written = list(map(compress_file, pending, levels))
+    for path, was_written in zip(pending, written):
+        if was_written:
+            rejected.pop(path, None)
+        else:
+            rejected[path] = os.stat(path).st_mtime_ns
+    return [path for path, was_written in zip(pending, written) if was_written]
+
+
+def compress_file(path, level=9):
+    with open(path, "rb") as f:
+        data = f.read()
+    # mtime=0 keeps the output identical for identical input
+    compressed = gzip.compress(data, level, mtime=0)
+    gz_path = compressed_path(path)
+    if len(compressed) > len(data) * MAX_RATIO:
+        remove_compressed(path)
+        return False
+    tmp_path = temp_path(gz_path)
+    with open(tmp_path, "wb") as f:
+        f.write(compressed)
+    stat = os.stat(path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_path, gz_path)
+    return True
+
+
+def remove_outdated(paths):
+    # with compression off, a .gz left by an earlier build must not be
+    # served in place of a file that has changed since
+    removed = []
+    for path in paths:
+        if os.path.exists(compressed_path(path)) and not is_current(path):
+            remove_compressed(path)
+            removed.append(compressed_path(path))
+    return removed
+
+
+def remove_compressed(path):
+    try:
+        os.remove(compressed_path(path))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,115 @@
+import json
+import os
+
+from node.textnode import TextType
+
+GRAPH_PATH = os.path.join(".build_cache", "depgraph.json")
+
+
+class DependencyGraph:
+    # outputs: {dest: {"inputs": [paths the output is built from],
+    #                  "references": [root-relative urls the page links to]}}
+    def __init__(self, path, dest_dir, outputs=None):
+        self.path = path
+        self.dest_dir = dest_dir
+        self.outputs = {}
+        self.dependents = {}
+        self.referrers = {}
+        for dest, entry in (outputs or {}).items():
+            self.record(dest, entry["inputs"], entry["references"])
+
+    @classmethod
+    def load(cls, dest_dir, path=GRAPH_PATH):
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, dest_dir)
+        if data.get("dest_dir") != dest_dir:
+            return cls(path, dest_dir)
+        return cls(path, dest_dir, data.get("outputs", {}))
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"dest_dir": self.dest_dir, "outputs": self.outputs}, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def __contains__(self, dest):
+        return dest in self.outputs
+
+    def record(self, dest, inputs, references=()):
+        self.remove(dest)
+        self.outputs[dest] = {"inputs": list(inputs), "references": list(references)}
+        for path in inputs:
+            self.dependents.setdefault(path, set()).add(dest)
+        for url in references:
+            target = url_to_dest(url, self.dest_dir)
+            self.referrers.setdefault(target, set()).add(dest)
+
+    def remove(self, dest):
+        entry = self.outputs.pop(dest, None)
+        if entry is None:
+            return
+        for path in entry["inputs"]:
+            self.dependents[path].discard(dest)
+        for url in entry["references"]:
+            self.referrers[url_to_dest(url, self.dest_dir)].discard(dest)
+
+    def retain(self, dests):
+        for dest in [dest for dest in self.outputs if dest not in dests]:
+            self.remove(dest)
+
+    def inputs(self, dest):
+        entry = self.outputs.get(dest)
+        return entry["inputs"] if entry is not None else []
+
+    def affected(self, path):
+        # outputs that must be rebuilt when the input at path changes
+        return sorted(self.dependents.get(path, ()))
+
+    def referencing(self, path):
+        # pages linking to an output of the input at path, or to path itself
+        # when it is an output
+        targets = self.affected(path) or [path]
+        pages = set()
+        for target in targets:
+            pages.update(self.referrers.get(target, ()))
+        return sorted(pages)
+
+
+def url_to_dest(url, dest_dir):
+    path = url.split("#", 1)[0].split("?", 1)[0].lstrip("/")
+    if not os.path.splitext(path)[1]:
+        path = os.path.join(path, "index.html")
+    return os.path.normpath(os.path.join(dest_dir, path))
+
+
+def dest_to_url(dest, dest_dir, basepath="/"):
+    path = os.path.relpath(dest, dest_dir).replace(os.sep, "/")
+    if path == "index.html":
+        return basepath
+    if path.endswith("/index.html"):
+        path = path[: -len("index.html")]
+    return basepath + path
+
+
+def collect_references(block_nodes):
+    # root-relative link and image urls, the ones that point into the site
+    references = set()
+    stack = list(block_nodes)
+    while stack:
+        node = stack.pop()
+        url = getattr(node, "url", None)
+        if url is None:
+            stack.extend(getattr(node, "children", None) or ())
+        elif (
+            node.text_type in (TextType.LINK, TextType.IMAGE)
+            and url.startswith("/")
+            and not url.startswith("//")
+        ):
+            references.add(url)
+    return sorted(references)
@@ -0,0 +1,74 @@
+import heapq
+import os
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+from build.depgraph import dest_to_url
+from build.output import open_if_changed
+
+# newest pages listed in a feed
+FEED_ENTRIES = 20
+
+# both files are written from the manifest's page entries alone, which keep
+# each page's dest, title and source mtime: no markdown is read again
+
+
+def timestamp(mtime):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(mtime))
+
+
+def write_sitemap(path, pages, dest_dir, site_url, basepath="/"):
+    # pages: {source: {"dest", "mtime", ...}} as kept by the manifest
+    urls = sorted(
+        (dest_to_url(entry["dest"], dest_dir, basepath), entry["mtime"])
+        for entry in pages.values()
+    )
+    with open_if_changed(path) as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for url, mtime in urls:
+            f.write(
+                f"<url><loc>{escape(site_url + url)}</loc>"
+                f"<lastmod>{timestamp(mtime)}</lastmod></url>\n"
+            )
+        f.write("</urlset>\n")
+
+
+def write_feed(
+    path,
+    pages,
+    section,
+    dest_dir,
+    site_url,
+    basepath="/",
+    title="Blog",
+    limit=FEED_ENTRIES,
+):
+    # an Atom feed of the newest pages whose source is inside section
+    in_section = (
+        entry
+        for source, entry in pages.items()
+        if os.path.commonpath([source, section]) == section
+    )
+    entries = heapq.nlargest(limit, in_section, key=lambda e: (e["mtime"], e["dest"]))
+    feed_url = site_url + dest_to_url(path, dest_dir, basepath)
+    section_index = os.path.join(os.path.dirname(path), "index.html")
+    section_url = site_url + dest_to_url(section_index, dest_dir, basepath)
+    updated = entries[0]["mtime"] if entries else 0
+    with open_if_changed(path) as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        f.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        f.write(f"<title>{escape(title)}</title>\n")
+        f.write(f"<author><name>{escape(title)}</name></author>\n")
+        f.write(f"<link href={quoteattr(section_url)} />\n")
+        f.write(f'<link rel="self" href={quoteattr(feed_url)} />\n')
+        f.write(f"<id>{escape(feed_url)}</id>\n")
+        f.write(f"<updated>{timestamp(updated)}</updated>\n")
+        for entry in entries:
+            url = site_url + dest_to_url(entry["dest"], dest_dir, basepath)
+            f.write(
+                f"<entry><title>{escape(entry['title'] or url)}</title>"
+                f"<link href={quoteattr(url)} /><id>{escape(url)}</id>"
+                f"<updated>{timestamp(entry['mtime'])}</updated></entry>\n"
+            )
+        f.write("</feed>\n")
@@ -0,0 +1,40 @@
+import os
+import re
+
+from build.manifest import hash_file
+
+FINGERPRINT_LENGTH = 10
+URL_SUFFIX_PATTERN = re.compile(r"[?#]")
+
+
+def fingerprinted_name(path, digest):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+
+def fingerprint_folder(src):
+    # {path: content hash} of every file under src, each hashed once
+    fingerprints = {}
+    for dirpath, dirnames, filenames in os.walk(src):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            fingerprints[path] = hash_file(path)
+    return fingerprints
+
+
+class AssetUrls:
+    # maps the root-relative url of a static file to its fingerprinted copy,
+    # keeping any query or fragment; other urls are returned unchanged
+    def __init__(self, fingerprints, src):
+        self.urls = {}
+        for path, digest in fingerprints.items():
+            url = "/" + os.path.relpath(path, src).replace(os.sep, "/")
+            self.urls[url] = fingerprinted_name(url, digest)
+
+    def __call__(self, url):
+        match = URL_SUFFIX_PATTERN.search(url)
+        if match is None:
+            return self.urls.get(url, url)
+        path = url[: match.start()]
+        return self.urls.get(path, path) + url[match.start() :]
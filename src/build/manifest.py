@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+
+MANIFEST_PATH = os.path.join(".build_cache", "manifest.json")
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    def __init__(self, path, inputs=None, pages=None, assets=None, uncompressed=None):
+        self.path = path
+        self.inputs = inputs if inputs is not None else {}
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else {}
+        # outputs not worth compressing -> their mtime, see build.compress
+        self.uncompressed = uncompressed if uncompressed is not None else {}
+        self.inputs_changed = False
+        self.seen = set()
+        self.seen_assets = set()
+
+    @classmethod
+    def load(cls, path=MANIFEST_PATH):
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        return cls(
+            path,
+            data.get("inputs", {}),
+            data.get("pages", {}),
+            data.get("assets", {}),
+            data.get("uncompressed", {}),
+        )
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "inputs": self.inputs,
+                    "pages": self.pages,
+                    "assets": self.assets,
+                    "uncompressed": self.uncompressed,
+                },
+                f,
+                indent=1,
+            )
+        os.replace(tmp_path, self.path)
+
+    def begin_build(self, **inputs):
+        # inputs shared by every page (template, basepath): any change
+        # invalidates all recorded pages
+        self.inputs_changed = inputs != self.inputs
+        self.inputs = inputs
+        self.seen = set()
+        self.seen_assets = set()
+
+    def is_fresh(self, source, source_hash, dest):
+        self.seen.add(source)
+        if self.inputs_changed:
+            return False
+        entry = self.pages.get(source)
+        return (
+            entry is not None
+            and entry["hash"] == source_hash
+            and entry["dest"] == dest
+            and "title" in entry
+            and os.path.exists(dest)
+        )
+
+    def record(self, source, source_hash, dest, title=None, mtime=None):
+        # title and mtime are kept for the sitemap and feed, see build.feeds
+        self.seen.add(source)
+        self.pages[source] = {
+            "hash": source_hash,
+            "dest": dest,
+            "title": title,
+            "mtime": mtime,
+        }
+
+    def invalidate(self, source):
+        # keeps the page and its output, but it is no longer fresh
+        if source in self.pages:
+            self.pages[source]["hash"] = None
+
+    def record_asset(self, source, dest):
+        self.seen_assets.add(dest)
+        self.assets[dest] = source
+
+    def remove_page(self, source):
+        entry = self.pages.pop(source, None)
+        self.seen.discard(source)
+        if entry is None:
+            return None
+        return self._remove_output(entry["dest"])
+
+    def remove_asset(self, dest):
+        self.seen_assets.discard(dest)
+        if self.assets.pop(dest, None) is None:
+            return None
+        return self._remove_output(dest)
+
+    def remove_stale(self):
+        stale = [source for source in self.pages if source not in self.seen]
+        return [dest for dest in map(self.remove_page, stale) if dest is not None]
+
+    def remove_stale_assets(self):
+        stale = [dest for dest in self.assets if dest not in self.seen_assets]
+        return [dest for dest in map(self.remove_asset, stale) if dest is not None]
+
+    def _remove_output(self, dest):
+        # another source may have taken over the same output path
+        live_dests = {entry["dest"] for entry in self.pages.values()}
+        if dest in live_dests or dest in self.assets or not os.path.exists(dest):
+            return None
+        os.remove(dest)
+        if os.path.exists(dest + ".gz"):
+            # its precompressed copy, see build.compress
+            os.remove(dest + ".gz")
+        remove_empty_dirs(os.path.dirname(dest))
+        return dest
+
+
+def remove_empty_dirs(path):
+    while path and os.path.isdir(path) and not os.listdir(path):
+        os.rmdir(path)
+        path = os.path.dirname(path)
@@ -0,0 +1,63 @@
+import contextlib
+import os
+
+from build.manifest import hash_bytes, hash_file
+
+# directories already created this run, so each is made once, not per page
+_made_dirs = set()
+
+
+def write_if_changed(dest, data):
+    # returns False, leaving dest and its mtime alone, when dest already
+    # holds exactly these bytes
+    if has_contents(dest, len(data), lambda: hash_bytes(data)):
+        return False
+    tmp_path = temp_path(dest)
+    with open_new(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, dest)
+    return True
+
+
+@contextlib.contextmanager
+def open_if_changed(dest):
+    # a text stream into a temp file that replaces dest when closed, unless
+    # dest already holds the same bytes
+    tmp_path = temp_path(dest)
+    try:
+        with open_new(tmp_path, "w", encoding="utf-8") as f:
+            yield f
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    if has_contents(dest, os.path.getsize(tmp_path), lambda: hash_file(tmp_path)):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, dest)
+
+
+def has_contents(path, size, digest):
+    try:
+        if os.stat(path).st_size != size:
+            return False
+    except FileNotFoundError:
+        return False
+    return hash_file(path) == digest()
+
+
+def temp_path(path):
+    # next to path, so the final os.replace stays on one filesystem
+    return f"{path}.{os.getpid()}.tmp"
+
+
+def open_new(path, mode, **kwargs):
+    directory = os.path.dirname(path)
+    if directory not in _made_dirs:
+        os.makedirs(directory or ".", exist_ok=True)
+        _made_dirs.add(directory)
+    try:
+        return open(path, mode, **kwargs)
+    except FileNotFoundError:
+        # removed since, when the last output in it went away
+        os.makedirs(directory, exist_ok=True)
+        return open(path, mode, **kwargs)
@@ -0,0 +1,181 @@
+import contextlib
+import json
+import os
+import time
+
+from html.leafnode import LeafNode
+from html.parentnode import ParentNode
+from markdown.parse_block_markdown import block_to_block_node, markdown_to_blocks
+from markdown.parse_inline_markdown import text_to_textnodes
+from node.blocknode import BlockNode
+from node.markdownToHtmlNode import block_nodes_to_html_node
+from node.textnode import TextNode
+
+REPORT_PATH = os.path.join(".build_cache", "build_report.json")
+
+STAGES = [
+    "read",
+    "ast_cache",
+    "block_split",
+    "block_parse",
+    "inline_parse",
+    "html_tree",
+    "serialize",
+    "template",
+    "write",
+]
+NODE_TYPES = [TextNode, BlockNode, LeafNode, ParentNode]
+
+
+class PageProfile:
+    def __init__(self, source):
+        self.source = source
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.counts = dict.fromkeys([node_type.__name__ for node_type in NODE_TYPES], 0)
+        self.output_bytes = 0
+        self.caches = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - start
+
+    def merge(self, other):
+        for name, seconds in other.stages.items():
+            self.stages[name] += seconds
+        for name, count in other.counts.items():
+            self.counts[name] += count
+        self.output_bytes += other.output_bytes
+        for name, counts in other.caches.items():
+            self.count_cache(name, counts["hits"], counts["misses"])
+
+    def count_cache(self, name, hits, misses):
+        counts = self.caches.setdefault(name, {"hits": 0, "misses": 0})
+        counts["hits"] += hits
+        counts["misses"] += misses
+
+    def count_nodes(self, nodes):
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            for node_type in NODE_TYPES:
+                if isinstance(node, node_type):
+                    self.counts[node_type.__name__] += 1
+                    break
+            if isinstance(node, (BlockNode, ParentNode)) and node.children:
+                stack.extend(node.children)
+
+    def total(self):
+        return sum(self.stages.values())
+
+    def to_dict(self):
+        return {
+            "source": self.source,
+            "seconds": self.total(),
+            "stages": self.stages,
+            "counts": self.counts,
+            "output_bytes": self.output_bytes,
+            "caches": self.caches,
+        }
+
+
+def stage(page_profile, name):
+    if page_profile is None:
+        return contextlib.nullcontext()
+    return page_profile.stage(name)
+
+
+def profile_markdown_to_block_nodes(
+    markdown, page_profile, inline_parser=text_to_textnodes
+):
+    # markdown_to_block_nodes split into separately timed stages; the time
+    # spent in inline parsing is moved out of block parsing
+    def timed_inline_parser(text):
+        start = time.perf_counter()
+        nodes = inline_parser(text)
+        inline_seconds[0] += time.perf_counter() - start
+        return nodes
+
+    inline_seconds = [0.0]
+    with page_profile.stage("block_split"):
+        blocks = markdown_to_blocks(markdown)
+    with page_profile.stage("block_parse"):
+        block_nodes = [
+            block_to_block_node(block, timed_inline_parser) for block in blocks
+        ]
+    page_profile.stages["block_parse"] -= inline_seconds[0]
+    page_profile.stages["inline_parse"] += inline_seconds[0]
+    return block_nodes
+
+
+def profile_block_nodes_to_html_node(block_nodes, page_profile, rewrite_url=None):
+    with page_profile.stage("html_tree"):
+        html_node = block_nodes_to_html_node(block_nodes, rewrite_url)
+    page_profile.count_nodes(block_nodes)
+    page_profile.count_nodes([html_node])
+    return html_node
+
+
+def profile_markdown_to_html_node(markdown, page_profile):
+    block_nodes = profile_markdown_to_block_nodes(markdown, page_profile)
+    return profile_block_nodes_to_html_node(block_nodes, page_profile)
+
+
+class BuildProfile:
+    def __init__(self):
+        self.pages = []
+        self.skipped = 0
+        self.start = time.perf_counter()
+
+    def add(self, page_profile):
+        self.pages.append(page_profile)
+
+    def slowest(self, top):
+        return sorted(self.pages, key=PageProfile.total, reverse=True)[:top]
+
+    def report(self, top=10):
+        totals = PageProfile(None)
+        for page in self.pages:
+            totals.merge(page)
+        return {
+            "seconds": time.perf_counter() - self.start,
+            "pages_rendered": len(self.pages),
+            "pages_skipped": self.skipped,
+            "stages": totals.stages,
+            "counts": totals.counts,
+            "output_bytes": totals.output_bytes,
+            "caches": totals.caches,
+            "slowest": [page.to_dict() for page in self.slowest(top)],
+            "pages": [page.to_dict() for page in self.pages],
+        }
+
+    def write_report(self, path=REPORT_PATH, top=10):
+        report = self.report(top)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=1)
+        return report
+
+
+def format_summary(report):
+    lines = [
+        f"Rendered {report['pages_rendered']} pages "
+        f"({report['pages_skipped']} unchanged) in {report['seconds']:.3f}s"
+    ]
+    for name, seconds in report["stages"].items():
+        lines.append(f"  {name:<13}{seconds * 1000:10.1f} ms")
+    for name, counts in report["caches"].items():
+        lines.append(f"{name} cache: {counts['hits']} hits, {counts['misses']} misses")
+    if report["slowest"]:
+        lines.append("Slowest pages:")
+    for page in report["slowest"]:
+        worst = max(page["stages"], key=page["stages"].get)
+        lines.append(
+            f"  {page['seconds'] * 1000:8.1f} ms  {page['source']} (mostly {worst})"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,110 @@
+import itertools
+import os
+
+from build.profile import (
+    profile_block_nodes_to_html_node,
+    profile_markdown_to_block_nodes,
+    stage,
+)
+from build.template import UrlRewriter
+from html.textNodeToHtmlNode import block_node_to_html_node
+from markdown.metadata import page_title, split_front_matter
+from markdown.parse_block_markdown import block_to_block_node, extract_title
+from markdown.parse_inline_markdown import text_to_textnodes
+from node.markdownToHtmlNode import block_nodes_to_html_node, markdown_to_block_nodes
+
+
+class PageRenderer:
+    # everything needed to turn one page's markdown into html; picklable,
+    # so the same renderer is handed to every worker process
+    def __init__(
+        self,
+        template,
+        basepath="/",
+        ast_cache=None,
+        inline_cache=None,
+        stream_threshold=None,
+        rewrite_url=None,
+    ):
+        self.template = template
+        self.basepath = basepath
+        self.ast_cache = ast_cache
+        self.inline_cache = inline_cache
+        self.inline_parser = inline_cache or text_to_textnodes
+        self.stream_threshold = stream_threshold
+        # rewrites link and image urls as their html nodes are built; None
+        # when every url stays as written
+        rewriter = UrlRewriter(basepath, rewrite_url)
+        self.rewrite_url = None if rewriter.is_identity() else rewriter
+
+    def should_stream(self, path):
+        return (
+            self.stream_threshold is not None
+            and os.path.getsize(path) > self.stream_threshold
+        )
+
+    def parse(self, md, source_hash=None, page_profile=None):
+        if self.ast_cache is not None and source_hash is not None:
+            with stage(page_profile, "ast_cache"):
+                block_nodes = self.ast_cache.get(source_hash)
+            if page_profile is not None:
+                page_profile.count_cache(
+                    "ast", block_nodes is not None, block_nodes is None
+                )
+            if block_nodes is not None:
+                return block_nodes
+        md = split_front_matter(md)[1]
+        if page_profile is None:
+            block_nodes = markdown_to_block_nodes(md, self.inline_parser)
+        elif self.inline_cache is None:
+            block_nodes = profile_markdown_to_block_nodes(md, page_profile)
+        else:
+            cache = self.inline_cache
+            hits, misses = cache.hits, cache.misses
+            block_nodes = profile_markdown_to_block_nodes(md, page_profile, cache)
+            page_profile.count_cache("inline", cache.hits - hits, cache.misses - misses)
+        if self.ast_cache is not None and source_hash is not None:
+            with stage(page_profile, "ast_cache"):
+                self.ast_cache.put(source_hash, block_nodes)
+        return block_nodes
+
+    def values(self, md, block_nodes):
+        html_node = block_nodes_to_html_node(block_nodes, self.rewrite_url)
+        return {"Title": page_title(md), "Content": html_node.iter_html()}
+
+    def write(self, stream, md, block_nodes):
+        self.template.write(stream, **self.values(md, block_nodes))
+
+    def render(self, md, block_nodes, page_profile=None):
+        if page_profile is None:
+            return self.template.render(**self.values(md, block_nodes))
+        html_node = profile_block_nodes_to_html_node(
+            block_nodes, page_profile, self.rewrite_url
+        )
+        with page_profile.stage("serialize"):
+            html = html_node.to_html()
+        with page_profile.stage("template"):
+            page = self.template.render(Title=page_title(md), Content=html)
+        page_profile.output_bytes = len(page.encode())
+        return page
+
+    def write_streamed(self, stream, blocks, visit=None, title=None):
+        # parses and renders one block at a time, for pages too large to hold
+        # as one tree; visit, if given, sees each block node before it is dropped.
+        # title defaults to the first heading; returns the title used
+        blocks = iter(blocks)
+        first = next(blocks, "")
+        title = title or extract_title(first)
+        content = self.stream_content(itertools.chain([first], blocks), visit)
+        self.template.write(stream, Title=title, Content=content)
+        return title
+
+    def stream_content(self, blocks, visit=None):
+        yield "<div>"
+        for block in blocks:
+            block_node = block_to_block_node(block, self.inline_parser)
+            if visit is not None:
+                visit(block_node)
+            html_node = block_node_to_html_node(block_node, self.rewrite_url)
+            yield from html_node.iter_html()
+        yield "</div>"
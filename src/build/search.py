@@ -0,0 +1,206 @@
+import json
+import os
+import re
+
+from build.depgraph import dest_to_url
+from build.output import write_if_changed
+from node.blocknode import BlockNode, BlockType
+
+SEARCH_STATE_PATH = os.path.join(".build_cache", "search.json")
+SEARCH_DIR = "search"
+SHARDS = 64
+MAX_POSITIONS = 8
+TOKEN_PATTERN = re.compile(r"\w{2,}")
+HEADING_WEIGHTS = {
+    BlockType.HEADING_1: 8,
+    BlockType.HEADING_2: 4,
+    BlockType.HEADING_3: 3,
+    BlockType.HEADING_4: 2,
+    BlockType.HEADING_5: 2,
+    BlockType.HEADING_6: 2,
+}
+
+# The index the browser loads, under <dest>/search/:
+#   pages.json  {"shards": SHARDS, "pages": [[url, title] or null, ...]}
+#               a page's position in "pages" is its id
+#   NN.json     {token: [[page id, weight, position, ...], ...]}, heaviest
+#               first; NN is shard_of(token) in hex, a 32-bit FNV-1a hash of
+#               the token's utf-8 bytes modulo SHARDS
+# Positions count words from the start of the page, at most MAX_POSITIONS.
+
+
+def shard_of(token):
+    value = 0x811C9DC5
+    for byte in token.encode():
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value % SHARDS
+
+
+def iter_text(block_node):
+    stack = [block_node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BlockNode):
+            stack.extend(reversed(node.children))
+        else:
+            yield node.text
+
+
+class PageTerms:
+    # a page's postings {token: [weight, position, ...]}, fed one block node
+    # at a time in document order
+    def __init__(self):
+        self.title = None
+        self.postings = {}
+        self.position = 0
+
+    def add(self, block_node):
+        weight = HEADING_WEIGHTS.get(block_node.block_type, 1)
+        if self.title is None and block_node.block_type == BlockType.HEADING_1:
+            self.title = "".join(iter_text(block_node))
+        for text in iter_text(block_node):
+            for token in TOKEN_PATTERN.findall(text.lower()):
+                posting = self.postings.get(token)
+                if posting is None:
+                    posting = self.postings[token] = [0]
+                posting[0] += weight
+                if len(posting) <= MAX_POSITIONS:
+                    posting.append(self.position)
+                self.position += 1
+
+    @classmethod
+    def from_block_nodes(cls, block_nodes):
+        terms = cls()
+        for block_node in block_nodes:
+            terms.add(block_node)
+        return terms
+
+
+class SearchIndex:
+    # the shard files hold the postings; the state only keeps each page's id,
+    # tokens and the hash of the source they came from, enough to know which
+    # shards a changed page touches
+    def __init__(self, path, dest_dir, basepath="/", pages=None):
+        self.path = path
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.out_dir = os.path.join(dest_dir, SEARCH_DIR)
+        self.pages = pages if pages is not None else {}
+        self.changed = {}
+        self.dirty_shards = set()
+        used = {entry["id"] for entry in self.pages.values()}
+        self.end_id = max(used, default=-1) + 1
+        self.free_ids = sorted(set(range(self.end_id)) - used, reverse=True)
+
+    @classmethod
+    def load(cls, dest_dir, basepath="/", path=SEARCH_STATE_PATH):
+        index = cls(path, dest_dir, basepath)
+        if not os.path.exists(os.path.join(index.out_dir, "pages.json")):
+            # without the published index the state is of no use
+            return index
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if data.get("dest_dir") != dest_dir or data.get("shards") != SHARDS:
+            return index
+        return cls(path, dest_dir, basepath, data["pages"])
+
+    def __contains__(self, source):
+        return source in self.pages
+
+    def is_current(self, source, source_hash):
+        entry = self.pages.get(source)
+        return entry is not None and entry.get("hash") == source_hash
+
+    def update(self, source, dest, terms, source_hash=None, title=None):
+        # title: the page's own, e.g. from its front matter; the first
+        # heading by default
+        entry = self.pages.get(source)
+        if entry is not None:
+            self.dirty_shards.update(map(shard_of, entry["tokens"]))
+            page_id = entry["id"]
+        else:
+            page_id = self.next_id()
+        self.pages[source] = {
+            "id": page_id,
+            "url": dest_to_url(dest, self.dest_dir, self.basepath),
+            "title": title if title is not None else terms.title,
+            "tokens": sorted(terms.postings),
+            "hash": source_hash,
+        }
+        self.changed[page_id] = terms.postings
+        self.dirty_shards.update(map(shard_of, terms.postings))
+
+    def remove(self, source):
+        entry = self.pages.pop(source, None)
+        if entry is not None:
+            self.changed[entry["id"]] = {}
+            self.dirty_shards.update(map(shard_of, entry["tokens"]))
+            self.free_ids.append(entry["id"])
+
+    def retain(self, sources):
+        for source in [source for source in self.pages if source not in sources]:
+            self.remove(source)
+
+    def next_id(self):
+        if self.free_ids:
+            return self.free_ids.pop()
+        self.end_id += 1
+        return self.end_id - 1
+
+    def save(self):
+        additions = {shard: {} for shard in self.dirty_shards}
+        for page_id, postings in self.changed.items():
+            for token, posting in postings.items():
+                tokens = additions[shard_of(token)]
+                tokens.setdefault(token, []).append([page_id, *posting])
+        for shard in sorted(additions):
+            self.write_shard(shard, additions[shard])
+        titles = [None] * (max(self.page_ids(), default=-1) + 1)
+        for entry in self.pages.values():
+            titles[entry["id"]] = [entry["url"], entry["title"]]
+        write_json(
+            os.path.join(self.out_dir, "pages.json"),
+            {"shards": SHARDS, "pages": titles},
+        )
+        self.changed = {}
+        self.dirty_shards = set()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"dest_dir": self.dest_dir, "shards": SHARDS, "pages": self.pages}, f
+            )
+        os.replace(tmp_path, self.path)
+
+    def page_ids(self):
+        return [entry["id"] for entry in self.pages.values()]
+
+    def write_shard(self, shard, additions):
+        path = os.path.join(self.out_dir, f"{shard:02x}.json")
+        try:
+            with open(path, "r") as f:
+                tokens = json.load(f)
+        except (OSError, ValueError):
+            tokens = {}
+        for token, postings in tokens.items():
+            tokens[token] = [p for p in postings if p[0] not in self.changed]
+        for token, postings in additions.items():
+            tokens.setdefault(token, []).extend(postings)
+        tokens = {
+            token: sorted(postings, key=lambda p: (-p[1], p[0]))
+            for token, postings in sorted(tokens.items())
+            if postings
+        }
+        if tokens:
+            write_json(path, tokens)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def write_json(path, data):
+    write_if_changed(path, json.dumps(data, separators=(",", ":")).encode())
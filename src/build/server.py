@@ -0,0 +1,87 @@
+import json
+import os
+import socket
+
+SOCKET_PATH = os.path.join(".build_cache", "build.sock")
+
+# one request per connection: the client sends a JSON object on one line,
+# e.g. {"command": "rebuild", "paths": ["content/index.md"]}, and reads the
+# JSON answer on one line. Without paths everything is rebuilt; "stop"
+# shuts the server down
+
+
+def serve_requests(handle, path=SOCKET_PATH):
+    # answers requests with handle(request) one at a time, so builds never
+    # overlap, until a stop request or an interrupt
+    if is_serving(path):
+        raise OSError(f"a build server is already listening on {path}")
+    if os.path.lexists(path):
+        os.remove(path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+        server.listen()
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                with connection.makefile("rb") as stream:
+                    line = stream.readline()
+                if not line:
+                    # a connection that only checked for a running server
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    request, response = {}, {"ok": False, "error": str(e)}
+                else:
+                    if not isinstance(request, dict):
+                        request, response = {}, {"ok": False, "error": "not an object"}
+                    else:
+                        response = handle(request)
+                try:
+                    connection.sendall(json.dumps(response).encode() + b"\n")
+                except OSError:
+                    # the client went away; the build still happened
+                    pass
+            if request.get("command") == "stop":
+                return
+    finally:
+        server.close()
+        os.remove(path)
+
+
+def is_serving(path=SOCKET_PATH):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+    except OSError:
+        return False
+    return True
+
+
+def find_socket(directory=None):
+    # the socket of the site directory is in or below, so a client works
+    # from anywhere inside it; SOCKET_PATH if there is none
+    directory = os.path.abspath(directory or os.getcwd())
+    while True:
+        path = os.path.join(directory, SOCKET_PATH)
+        if os.path.exists(path):
+            return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return SOCKET_PATH
+        directory = parent
+
+
+def send_request(request, path=SOCKET_PATH):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        client.sendall(json.dumps(request).encode() + b"\n")
+        with client.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise OSError("the build server closed the connection")
+    return json.loads(line)
@@ -0,0 +1,106 @@
+import argparse
+import hashlib
+import os
+import re
+
+from build.depgraph import GRAPH_PATH, DependencyGraph
+from build.manifest import MANIFEST_PATH, Manifest
+
+SHARD_DIR = os.path.join(".build_cache", "shards")
+SHARD_PATTERN = re.compile(r"manifest-(\d+)-of-(\d+)\.json")
+
+# a sharded build renders the pages whose source hashes to its shard and
+# keeps its own manifest and dependency graph under SHARD_DIR; every shard
+# copies all static files. Merging checks that the shards fit together and
+# writes the usual manifest and graph, so the next build is incremental
+
+
+def parse_shard(value):
+    # "i/N", i counted from 1
+    index, separator, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        index = count = 0
+    if not separator or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"expected i/N with 1 <= i <= N, not {value}")
+    return index, count
+
+
+def shard_of(path, count):
+    # 1 to count; hashed with / separators, so every machine agrees
+    key = os.path.normpath(path).replace(os.sep, "/").encode()
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big") % count + 1
+
+
+def select_shard(pages, index, count):
+    return [page for page in pages if shard_of(page[0], count) == index]
+
+
+def shard_paths(index, count, directory=SHARD_DIR):
+    # the manifest and dependency graph of one shard
+    name = f"{index}-of-{count}.json"
+    return (
+        os.path.join(directory, f"manifest-{name}"),
+        os.path.join(directory, f"depgraph-{name}"),
+    )
+
+
+def find_shards(directory=SHARD_DIR):
+    # the shard count of the build whose manifests are in directory,
+    # checking none of them is missing
+    shards = {}
+    counts = set()
+    for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+        match = SHARD_PATTERN.fullmatch(name)
+        if match is not None:
+            index, count = int(match.group(1)), int(match.group(2))
+            shards[index] = count
+            counts.add(count)
+    if not counts:
+        raise ValueError(f"no shard manifests in {directory}")
+    if len(counts) > 1:
+        raise ValueError(f"shards of different builds in {directory}: {sorted(counts)}")
+    count = counts.pop()
+    missing = [str(i) for i in range(1, count + 1) if i not in shards]
+    if missing:
+        raise ValueError(f"missing shards {', '.join(missing)} of {count}")
+    return count
+
+
+def merge_shards(
+    dest_dir, directory=SHARD_DIR, path=MANIFEST_PATH, graph_path=GRAPH_PATH
+):
+    # returns the merged manifest and graph, unsaved; raises ValueError
+    # listing every collision
+    count = find_shards(directory)
+    manifest = Manifest(path)
+    graph = DependencyGraph(graph_path, dest_dir)
+    owners = {}
+    problems = []
+    for index in range(1, count + 1):
+        manifest_path, shard_graph_path = shard_paths(index, count, directory)
+        shard = Manifest.load(manifest_path)
+        if index == 1:
+            manifest.inputs = shard.inputs
+        elif shard.inputs != manifest.inputs:
+            problems.append(f"shard {index} was built with different inputs")
+        for source, entry in shard.pages.items():
+            owner = owners.setdefault(entry["dest"], source)
+            if source in manifest.pages:
+                problems.append(f"{source} was built by more than one shard")
+            elif owner != source:
+                problems.append(f"{source} and {owner} both write {entry['dest']}")
+            manifest.pages[source] = entry
+        for dest, source in shard.assets.items():
+            owner = owners.setdefault(dest, source)
+            if owner != source:
+                problems.append(f"{source} and {owner} both write {dest}")
+            manifest.assets[dest] = source
+        manifest.uncompressed.update(shard.uncompressed)
+        shard_graph = DependencyGraph.load(dest_dir, shard_graph_path)
+        for dest, entry in shard_graph.outputs.items():
+            graph.record(dest, entry["inputs"], entry["references"])
+    if problems:
+        raise ValueError("\n".join(problems))
+    return manifest, graph
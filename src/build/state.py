@@ -0,0 +1,103 @@
+import os
+
+from build.depgraph import collect_references
+from build.profile import PageProfile
+from build.search import PageTerms
+
+
+class PageFacts:
+    # what a build records about a page besides its output, gathered one
+    # block node at a time so streamed pages can be scanned as they render
+    def __init__(self, index_terms=False):
+        self.references = set()
+        self.title = None
+        self.terms = PageTerms() if index_terms else None
+
+    def add(self, block_node):
+        self.references.update(collect_references([block_node]))
+        if self.terms is not None:
+            self.terms.add(block_node)
+
+    @classmethod
+    def from_block_nodes(cls, block_nodes, index_terms=False):
+        facts = cls(index_terms)
+        for block_node in block_nodes:
+            facts.add(block_node)
+        return facts
+
+
+class BuildState:
+    # the records kept about every page: the manifest, dependency graph,
+    # search index and profile, each optional
+    def __init__(self, manifest=None, graph=None, search=None, profile=None):
+        self.manifest = manifest
+        self.graph = graph
+        self.search = search
+        self.profile = profile
+        # maps the urls pages link to onto the urls in their output
+        self.rewrite_url = None
+        # outputs to render even if their source has not changed
+        self.stale_outputs = set()
+        # pages recorded since this was last reset
+        self.rendered = 0
+        # source -> error of the pages that failed since this was last reset
+        self.failed = {}
+
+    def page_profile(self, source):
+        return PageProfile(source) if self.profile is not None else None
+
+    def new_facts(self):
+        return PageFacts(self.search is not None)
+
+    def is_fresh(self, source, source_hash, dest):
+        # a page missing from the graph or the search index is rendered
+        # again to learn its links and terms
+        fresh = (
+            self.manifest is not None
+            and dest not in self.stale_outputs
+            and self.manifest.is_fresh(source, source_hash, dest)
+            and (self.graph is None or dest in self.graph)
+            and (self.search is None or self.search.is_current(source, source_hash))
+        )
+        if fresh and self.profile is not None:
+            self.profile.skipped += 1
+        return fresh
+
+    def record(self, source, source_hash, dest, inputs, facts, page_profile=None):
+        # inputs: every file the output was built from, source first
+        self.rendered += 1
+        self.stale_outputs.discard(dest)
+        self.failed.pop(source, None)
+        if page_profile is not None:
+            self.profile.add(page_profile)
+        if self.manifest is not None:
+            mtime = os.path.getmtime(source)
+            self.manifest.record(source, source_hash, dest, facts.title, mtime)
+        if self.graph is not None:
+            references = facts.references
+            if self.rewrite_url is not None:
+                references = map(self.rewrite_url, references)
+            self.graph.record(dest, inputs, sorted(references))
+        if self.search is not None:
+            self.search.update(source, dest, facts.terms, source_hash, facts.title)
+
+    def fail(self, source, dest, error):
+        # the output is left as it was: render it again next time, also in
+        # a new process
+        self.failed[source] = f"{type(error).__name__}: {error}"
+        self.stale_outputs.add(dest)
+        if self.manifest is not None:
+            self.manifest.invalidate(source)
+
+    def live_outputs(self):
+        pages = {entry["dest"] for entry in self.manifest.pages.values()}
+        return pages | set(self.manifest.assets)
+
+    def save(self):
+        self.manifest.save()
+        if self.graph is not None:
+            self.graph.retain(self.live_outputs())
+            self.graph.save()
+        if self.search is not None:
+            self.search.retain(self.manifest.pages)
+            self.search.save()
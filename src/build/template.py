@@ -0,0 +1,94 @@
+import re
+
+from build.manifest import hash_bytes
+
+SLOT_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+ROOT_URL_PATTERN = re.compile(r'(href|src)="(/[^"]*)"')
+
+
+def rewrite_urls(html, rewrite_url):
+    # applies rewrite_url to every root-relative href and src attribute
+    return ROOT_URL_PATTERN.sub(
+        lambda match: f'{match.group(1)}="{rewrite_url(match.group(2))}"', html
+    )
+
+
+class UrlRewriter:
+    # maps a root-relative url onto the deployed site: through rewrite_url,
+    # if given, then under basepath; other urls are returned unchanged
+    def __init__(self, basepath="/", rewrite_url=None):
+        self.basepath = basepath
+        self.rewrite_url = rewrite_url
+
+    def is_identity(self):
+        return self.basepath == "/" and self.rewrite_url is None
+
+    def __call__(self, url):
+        if not url.startswith("/") or url.startswith("//"):
+            return url
+        if self.rewrite_url is not None:
+            url = self.rewrite_url(url)
+        return self.basepath + url[1:]
+
+
+class Template:
+    def __init__(self, segments, slots, path=None):
+        # segments alternate literal text and slot placeholders: slots maps
+        # the index of every placeholder segment to its slot name
+        self.segments = segments
+        self.slots = slots
+        self.path = path
+
+    @classmethod
+    def compile(cls, text, basepath="/", path=None, rewrite_url=None):
+        rewriter = UrlRewriter(basepath, rewrite_url)
+        if not rewriter.is_identity():
+            text = rewrite_urls(text, rewriter)
+        parts = SLOT_PATTERN.split(text)
+        segments = []
+        slots = {}
+        for i, part in enumerate(parts):
+            if i % 2 == 0:
+                segments.append(part)
+            else:
+                slots[len(segments)] = part
+                segments.append(f"{{{{ {part} }}}}")
+        return cls(segments, slots, path)
+
+    @classmethod
+    def load(cls, path, basepath="/", rewrite_url=None):
+        with open(path, "r") as f:
+            return cls.compile(f.read(), basepath, path, rewrite_url)
+
+    def render(self, **values):
+        segments = list(self.segments)
+        for index, name in self.slots.items():
+            if name in values:
+                value = values[name]
+                segments[index] = value if isinstance(value, str) else "".join(value)
+        return "".join(segments)
+
+    def write(self, stream, **values):
+        # values may be strings or iterables of fragments, which are written
+        # as they are produced
+        for index, segment in enumerate(self.segments):
+            name = self.slots.get(index)
+            if name not in values:
+                stream.write(segment)
+            elif isinstance(values[name], str):
+                stream.write(values[name])
+            else:
+                for fragment in values[name]:
+                    stream.write(fragment)
+
+    def digest(self):
+        # covers the source and everything applied when compiling it
+        return hash_bytes("".join(self.segments).encode())
+
+    def __eq__(self, other):
+        if not isinstance(other, Template):
+            return False
+        return self.segments == other.segments and self.slots == other.slots
+
+    def __repr__(self):
+        return f"Template({self.segments}, {self.slots}, {self.path})"
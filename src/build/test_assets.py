@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+from build.assets import copy_file, needs_copy, sync_folder
+from build.manifest import Manifest
+
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.src, "images"))
+        self.write(os.path.join(self.src, "index.css"), b"body {}")
+        self.write(os.path.join(self.src, "images", "logo.png"), b"\x89PNG")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_sync_copies_tree(self):
+        copied = sync_folder(self.src, self.dest)
+        self.assertEqual(len(copied), 2)
+        self.assertEqual(self.read(os.path.join(self.dest, "index.css")), b"body {}")
+        self.assertEqual(
+            self.read(os.path.join(self.dest, "images", "logo.png")), b"\x89PNG"
+        )
+
+    def test_sync_skips_unchanged_files(self):
+        sync_folder(self.src, self.dest)
+        self.assertEqual(sync_folder(self.src, self.dest), [])
+
+    def test_sync_copies_changed_files(self):
+        sync_folder(self.src, self.dest)
+        self.write(os.path.join(self.src, "index.css"), b"body { margin: 0 }")
+        self.assertEqual(
+            sync_folder(self.src, self.dest), [os.path.join(self.dest, "index.css")]
+        )
+
+    def test_checksum_detects_same_size_changes(self):
+        sync_folder(self.src, self.dest)
+        css = os.path.join(self.src, "index.css")
+        stat = os.stat(css)
+        self.write(css, b"body []")
+        os.utime(css, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        dest_css = os.path.join(self.dest, "index.css")
+        self.assertFalse(needs_copy(css, dest_css))
+        self.assertTrue(needs_copy(css, dest_css, checksum=True))
+
+    def test_link_does_not_write_through_to_source(self):
+        css = os.path.join(self.src, "index.css")
+        dest_css = os.path.join(self.dest, "index.css")
+        os.makedirs(self.dest)
+        copy_file(css, dest_css, link=True)
+        self.assertTrue(os.path.samefile(css, dest_css))
+        self.assertFalse(needs_copy(css, dest_css))
+
+        copy_file(os.path.join(self.src, "images", "logo.png"), dest_css)
+        self.assertEqual(self.read(css), b"body {}")
+
+    def test_stale_assets_are_removed(self):
+        manifest = Manifest(os.path.join(self.tmp.name, "manifest.json"))
+        sync_folder(self.src, self.dest, manifest)
+        os.remove(os.path.join(self.src, "images", "logo.png"))
+
+        manifest.begin_build()
+        sync_folder(self.src, self.dest, manifest)
+        self.assertEqual(
+            manifest.remove_stale_assets(),
+            [os.path.join(self.dest, "images", "logo.png")],
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css")))
+
+
+if __name__ == "__main__":
+    unittest.main()
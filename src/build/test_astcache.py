@@ -0,0 +1,91 @@
+import os
+import pickle
+import tempfile
+import time
+import unittest
+
+from build.astcache import PARSER_MODULES, AstCache
+from markdown import metadata
+from node.markdownToHtmlNode import markdown_to_block_nodes
+from node.textnode import NEWLINE
+
+MARKDOWN = """# Title
+
+Some **bold** text
+on two lines
+
+- one
+- two [link](/x)
+"""
+
+
+class TestAstCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "ast")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        cache = AstCache(self.dir)
+        block_nodes = markdown_to_block_nodes(MARKDOWN)
+        cache.put("abc", block_nodes)
+
+        cached = AstCache(self.dir).get("abc")
+        self.assertEqual(cached, block_nodes)
+        self.assertIs(cached[1].children[3], NEWLINE)
+
+    def test_miss(self):
+        cache = AstCache(self.dir)
+        self.assertIsNone(cache.get("abc"))
+        cache.put("abc", [])
+        self.assertEqual(cache.get("abc"), [])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_parser_version_is_part_of_the_key(self):
+        cache = AstCache(self.dir)
+        cache.put("abc", [])
+        cache.version = "other"
+        self.assertIsNone(cache.get("abc"))
+
+    def test_front_matter_parser_is_part_of_the_key(self):
+        # parse() strips front matter before the tree is cached
+        self.assertIn(metadata, PARSER_MODULES)
+
+    def test_damaged_entry_is_a_miss(self):
+        cache = AstCache(self.dir)
+        cache.put("abc", [])
+        with open(cache.entry_path("abc"), "wb") as f:
+            f.write(b"not a pickle")
+        self.assertIsNone(cache.get("abc"))
+
+    def test_memory_entries(self):
+        cache = AstCache(self.dir, memory_entries=1)
+        block_nodes = markdown_to_block_nodes(MARKDOWN)
+        cache.put("a", block_nodes)
+        self.assertIs(cache.get("a"), block_nodes)
+        cache.put("b", [])
+        self.assertEqual(list(cache.memory), ["b"])
+        self.assertEqual(cache.get("a"), block_nodes)
+        self.assertEqual(list(cache.memory), ["a"])
+        self.assertEqual(pickle.loads(pickle.dumps(cache)).memory, {})
+
+    def test_evicts_least_recently_used(self):
+        cache = AstCache(self.dir)
+        block_nodes = markdown_to_block_nodes(MARKDOWN)
+        for i, key in enumerate(["a", "b", "c"]):
+            cache.put(key, block_nodes)
+            past = time.time() - 100 + i
+            os.utime(cache.entry_path(key), (past, past))
+        cache.get("a")
+        cache.max_bytes = 2 * os.path.getsize(cache.entry_path("a"))
+
+        self.assertEqual(cache.evict(), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+
+if __name__ == "__main__":
+    unittest.main()
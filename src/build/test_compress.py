@@ -0,0 +1,81 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from build import compress
+from build.compress import compress_outputs, is_current, remove_outdated
+
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.page = self.write("index.html", b"<p>hello hello hello</p>" * 50)
+        self.css = self.write("index.css", b"body { color: red; }\n" * 50)
+        self.image = self.write("logo.png", b"\x89PNG" * 50)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_compresses_text_outputs(self):
+        paths = [self.page, self.css, self.image]
+        self.assertEqual(compress_outputs(paths), [self.page, self.css])
+        with gzip.open(self.page + ".gz") as f:
+            self.assertEqual(f.read(), b"<p>hello hello hello</p>" * 50)
+        self.assertFalse(os.path.exists(self.image + ".gz"))
+        self.assertTrue(is_current(self.page))
+
+    def test_skips_unchanged_files(self):
+        compress_outputs([self.page])
+        self.assertEqual(compress_outputs([self.page]), [])
+        os.utime(self.page, (0, 0))
+        self.assertEqual(compress_outputs([self.page]), [self.page])
+
+    def test_output_is_deterministic(self):
+        compress_outputs([self.page])
+        with open(self.page + ".gz", "rb") as f:
+            first = f.read()
+        os.utime(self.page, (0, 0))
+        compress_outputs([self.page], jobs=2)
+        with open(self.page + ".gz", "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_skips_incompressible_files(self):
+        svg = self.write("icon.svg", os.urandom(512))
+        self.assertEqual(compress_outputs([svg]), [])
+        self.assertFalse(os.path.exists(svg + ".gz"))
+
+    def test_remembers_incompressible_files(self):
+        svg = self.write("icon.svg", os.urandom(512))
+        rejected = {}
+        compress_outputs([svg, self.page], rejected=rejected)
+        self.assertEqual(rejected, {svg: os.stat(svg).st_mtime_ns})
+        with mock.patch.object(
+            compress, "compress_file", wraps=compress.compress_file
+        ) as compress_file:
+            self.assertEqual(compress_outputs([svg], rejected=rejected), [])
+            compress_file.assert_not_called()
+            # tried again once it changes
+            self.write("icon.svg", b"<svg></svg>" * 50)
+            os.utime(svg, ns=(0, 0))
+            self.assertEqual(compress_outputs([svg], rejected=rejected), [svg])
+        self.assertEqual(rejected, {})
+
+    def test_remove_outdated(self):
+        compress_outputs([self.page, self.css])
+        os.utime(self.page, (0, 0))
+        self.assertEqual(
+            remove_outdated([self.page, self.css, self.image]), [self.page + ".gz"]
+        )
+        self.assertTrue(os.path.exists(self.css + ".gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+
+from build.depgraph import (
+    DependencyGraph,
+    collect_references,
+    dest_to_url,
+    url_to_dest,
+)
+from node.markdownToHtmlNode import markdown_to_block_nodes
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache", "depgraph.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build_graph(self):
+        graph = DependencyGraph(self.path, "docs")
+        graph.record("docs/index.css", ["static/index.css"])
+        graph.record("docs/img/a.png", ["static/img/a.png"])
+        graph.record(
+            "docs/index.html",
+            ["content/index.md", "template.html"],
+            ["/blog/tom", "/img/a.png"],
+        )
+        graph.record(
+            "docs/blog/tom/index.html",
+            ["content/blog/tom/index.md", "template.html"],
+            ["/#top"],
+        )
+        return graph
+
+    def test_affected(self):
+        graph = self.build_graph()
+        self.assertEqual(
+            graph.affected("template.html"),
+            ["docs/blog/tom/index.html", "docs/index.html"],
+        )
+        self.assertEqual(graph.affected("static/img/a.png"), ["docs/img/a.png"])
+        self.assertEqual(graph.affected("static/other.png"), [])
+
+    def test_referencing(self):
+        graph = self.build_graph()
+        self.assertEqual(graph.referencing("static/img/a.png"), ["docs/index.html"])
+        self.assertEqual(
+            graph.referencing("content/blog/tom/index.md"), ["docs/index.html"]
+        )
+        self.assertEqual(
+            graph.referencing("docs/index.html"), ["docs/blog/tom/index.html"]
+        )
+
+    def test_record_replaces_previous_edges(self):
+        graph = self.build_graph()
+        graph.record("docs/index.html", ["content/index.md", "template.html"], [])
+        self.assertEqual(graph.referencing("static/img/a.png"), [])
+
+    def test_retain(self):
+        graph = self.build_graph()
+        graph.retain({"docs/index.html"})
+        self.assertEqual(graph.affected("template.html"), ["docs/index.html"])
+        self.assertNotIn("docs/index.css", graph)
+
+    def test_save_and_load(self):
+        graph = self.build_graph()
+        graph.save()
+        loaded = DependencyGraph.load("docs", self.path)
+        self.assertEqual(loaded.outputs, graph.outputs)
+        self.assertEqual(loaded.referencing("static/img/a.png"), ["docs/index.html"])
+        self.assertEqual(DependencyGraph.load("public", self.path).outputs, {})
+
+    def test_url_to_dest(self):
+        self.assertEqual(url_to_dest("/", "docs"), "docs/index.html")
+        self.assertEqual(
+            url_to_dest("/blog/tom?x=1", "docs"), "docs/blog/tom/index.html"
+        )
+        self.assertEqual(url_to_dest("/img/a.png", "docs"), "docs/img/a.png")
+
+    def test_dest_to_url(self):
+        self.assertEqual(dest_to_url("docs/index.html", "docs", "/site/"), "/site/")
+        self.assertEqual(dest_to_url("docs/blog/tom/index.html", "docs"), "/blog/tom/")
+        self.assertEqual(
+            dest_to_url("docs/about.html", "docs", "/site/"), "/site/about.html"
+        )
+
+    def test_collect_references(self):
+        block_nodes = markdown_to_block_nodes(
+            "[home](/) and [out](https://example.com)\n\n"
+            "- ![pic](/img/a.png)\n- [again](/)\n\n"
+            "```\n[code](/not/a/link)\n```"
+        )
+        self.assertEqual(collect_references(block_nodes), ["/", "/img/a.png"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+
+from build.feeds import write_feed, write_sitemap
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+class TestFeeds(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest_dir = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.dest_dir, "blog"))
+        self.pages = {
+            os.path.join("content", "index.md"): self.entry("index.html", "Home", 0),
+            os.path.join("content", "blog", "a", "index.md"): self.entry(
+                "blog/a/index.html", "A & B", 200
+            ),
+            os.path.join("content", "blog", "b", "index.md"): self.entry(
+                "blog/b/index.html", "B", 100
+            ),
+            os.path.join("content", "blogroll", "index.md"): self.entry(
+                "blogroll/index.html", "Roll", 300
+            ),
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def entry(self, dest, title, mtime):
+        dest = os.path.join(self.dest_dir, *dest.split("/"))
+        return {"hash": "h", "dest": dest, "title": title, "mtime": mtime}
+
+    def test_sitemap_lists_every_page(self):
+        path = os.path.join(self.dest_dir, "sitemap.xml")
+        write_sitemap(path, self.pages, self.dest_dir, "https://x.org", "/site/")
+        urls = [
+            url.find(f"{SITEMAP}loc").text
+            for url in ET.parse(path).getroot().iter(f"{SITEMAP}url")
+        ]
+        self.assertEqual(
+            urls,
+            [
+                "https://x.org/site/",
+                "https://x.org/site/blog/a/",
+                "https://x.org/site/blog/b/",
+                "https://x.org/site/blogroll/",
+            ],
+        )
+
+    def test_feed_lists_newest_pages_of_section(self):
+        path = os.path.join(self.dest_dir, "blog", "atom.xml")
+        section = os.path.join("content", "blog")
+        write_feed(path, self.pages, section, self.dest_dir, "https://x.org", limit=1)
+        feed = ET.parse(path).getroot()
+        self.assertEqual(feed.find(f"{ATOM}id").text, "https://x.org/blog/atom.xml")
+        self.assertEqual(feed.find(f"{ATOM}updated").text, "1970-01-01T00:03:20Z")
+        entries = feed.findall(f"{ATOM}entry")
+        self.assertEqual([e.find(f"{ATOM}title").text for e in entries], ["A & B"])
+        self.assertEqual(
+            entries[0].find(f"{ATOM}link").get("href"), "https://x.org/blog/a/"
+        )
+
+    def test_unchanged_feed_is_not_rewritten(self):
+        path = os.path.join(self.dest_dir, "sitemap.xml")
+        write_sitemap(path, self.pages, self.dest_dir, "https://x.org")
+        os.utime(path, (0, 0))
+        write_sitemap(path, self.pages, self.dest_dir, "https://x.org")
+        self.assertEqual(os.path.getmtime(path), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from build.assets import sync_folder
+from build.fingerprint import AssetUrls, fingerprint_folder, fingerprinted_name
+from build.manifest import Manifest, hash_bytes
+
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.src, "images"))
+        self.write(os.path.join(self.src, "index.css"), b"body {}")
+        self.write(os.path.join(self.src, "images", "logo.png"), b"\x89PNG")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(
+            fingerprinted_name("docs/index.css", "0123456789abcdef"),
+            "docs/index.0123456789.css",
+        )
+        self.assertEqual(
+            fingerprinted_name("LICENSE", "0123456789ab"), "LICENSE.0123456789"
+        )
+
+    def test_asset_urls(self):
+        css_hash = hash_bytes(b"body {}")[:10]
+        urls = AssetUrls(fingerprint_folder(self.src), self.src)
+        self.assertEqual(urls("/index.css"), f"/index.{css_hash}.css")
+        self.assertEqual(urls("/index.css?v=1#top"), f"/index.{css_hash}.css?v=1#top")
+        self.assertEqual(urls("/images/other.png"), "/images/other.png")
+        self.assertEqual(
+            urls("https://example.com/index.css"), "https://example.com/index.css"
+        )
+
+    def test_sync_copies_to_fingerprinted_names(self):
+        manifest = Manifest(os.path.join(self.tmp.name, "manifest.json"))
+        fingerprints = fingerprint_folder(self.src)
+        copied = sync_folder(self.src, self.dest, manifest, fingerprints=fingerprints)
+        logo_hash = hash_bytes(b"\x89PNG")[:10]
+        logo = os.path.join(self.dest, "images", f"logo.{logo_hash}.png")
+        self.assertIn(logo, copied)
+        self.assertEqual(
+            manifest.assets[logo], os.path.join(self.src, "images", "logo.png")
+        )
+        self.assertEqual(
+            sync_folder(self.src, self.dest, fingerprints=fingerprints), []
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
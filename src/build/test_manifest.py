@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from build.manifest import Manifest, hash_bytes, hash_file
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.path = os.path.join(self.dir, "cache", "manifest.json")
+        self.dest = os.path.join(self.dir, "out", "page", "index.html")
+        os.makedirs(os.path.dirname(self.dest))
+        with open(self.dest, "w") as f:
+            f.write("<p>page</p>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hash_file_matches_hash_bytes(self):
+        self.assertEqual(hash_file(self.dest), hash_bytes(b"<p>page</p>"))
+
+    def test_load_missing_manifest(self):
+        manifest = Manifest.load(self.path)
+        self.assertEqual(manifest.pages, {})
+        self.assertFalse(manifest.is_fresh("page.md", "abc", self.dest))
+
+    def test_fresh_after_save_and_load(self):
+        manifest = Manifest.load(self.path)
+        manifest.begin_build(template="t", basepath="/")
+        manifest.record("page.md", "abc", self.dest)
+        manifest.save()
+
+        manifest = Manifest.load(self.path)
+        manifest.begin_build(template="t", basepath="/")
+        self.assertTrue(manifest.is_fresh("page.md", "abc", self.dest))
+        self.assertFalse(manifest.is_fresh("page.md", "def", self.dest))
+
+    def test_input_change_invalidates_pages(self):
+        manifest = Manifest(self.path)
+        manifest.begin_build(template="t", basepath="/")
+        manifest.record("page.md", "abc", self.dest)
+        manifest.begin_build(template="t", basepath="/blog/")
+        self.assertFalse(manifest.is_fresh("page.md", "abc", self.dest))
+
+    def test_missing_output_is_not_fresh(self):
+        manifest = Manifest(self.path)
+        manifest.record("page.md", "abc", self.dest)
+        os.remove(self.dest)
+        self.assertFalse(manifest.is_fresh("page.md", "abc", self.dest))
+
+    def test_invalidated_page_is_not_fresh(self):
+        manifest = Manifest(self.path)
+        manifest.record("page.md", "abc", self.dest)
+        manifest.invalidate("page.md")
+        manifest.invalidate("missing.md")
+        self.assertFalse(manifest.is_fresh("page.md", "abc", self.dest))
+        # the page and its output are kept
+        self.assertEqual(manifest.remove_stale(), [])
+        self.assertTrue(os.path.exists(self.dest))
+
+    def test_remove_stale(self):
+        manifest = Manifest(self.path)
+        manifest.record("page.md", "abc", self.dest)
+        manifest.save()
+
+        manifest = Manifest.load(self.path)
+        self.assertEqual(manifest.remove_stale(), [self.dest])
+        self.assertEqual(manifest.pages, {})
+        self.assertFalse(os.path.exists(os.path.dirname(self.dest)))
+
+
+if __name__ == "__main__":
+    unittest.main()
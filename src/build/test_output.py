@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from build.output import open_if_changed, write_if_changed
+
+
+class TestOutput(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "docs", "page", "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def age(self, path):
+        os.utime(path, (0, 0))
+
+    def test_write_creates_directories(self):
+        self.assertTrue(write_if_changed(self.dest, b"<p>one</p>"))
+        self.assertEqual(self.read(self.dest), b"<p>one</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_identical_write_keeps_mtime(self):
+        write_if_changed(self.dest, b"<p>one</p>")
+        self.age(self.dest)
+        self.assertFalse(write_if_changed(self.dest, b"<p>one</p>"))
+        self.assertEqual(os.stat(self.dest).st_mtime, 0)
+
+    def test_same_size_change_is_written(self):
+        write_if_changed(self.dest, b"<p>one</p>")
+        self.assertTrue(write_if_changed(self.dest, b"<p>two</p>"))
+        self.assertEqual(self.read(self.dest), b"<p>two</p>")
+
+    def test_write_replaces_rather_than_writes_through(self):
+        write_if_changed(self.dest, b"<p>one</p>")
+        other = os.path.join(self.tmp.name, "other.html")
+        os.link(self.dest, other)
+        write_if_changed(self.dest, b"<p>two</p>")
+        self.assertEqual(self.read(other), b"<p>one</p>")
+
+    def test_streamed_write(self):
+        with open_if_changed(self.dest) as f:
+            f.write("<p>")
+            f.write("one</p>")
+        self.age(self.dest)
+        with open_if_changed(self.dest) as f:
+            f.write("<p>one</p>")
+        self.assertEqual(os.stat(self.dest).st_mtime, 0)
+        with open_if_changed(self.dest) as f:
+            f.write("<p>two</p>")
+        self.assertEqual(self.read(self.dest), b"<p>two</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_failed_stream_leaves_dest_alone(self):
+        write_if_changed(self.dest, b"<p>one</p>")
+        with self.assertRaises(ValueError):
+            with open_if_changed(self.dest) as f:
+                f.write("<p>partial")
+                raise ValueError("render failed")
+        self.assertEqual(self.read(self.dest), b"<p>one</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_directory_removed_after_first_write(self):
+        write_if_changed(self.dest, b"<p>one</p>")
+        shutil.rmtree(os.path.dirname(self.dest))
+        self.assertTrue(write_if_changed(self.dest, b"<p>one</p>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from build.profile import (
+    STAGES,
+    BuildProfile,
+    PageProfile,
+    format_summary,
+    profile_markdown_to_html_node,
+)
+from node.markdownToHtmlNode import markdown_to_html_node
+
+MARKDOWN = """# Title
+
+Some **bold** text
+on two lines
+
+- one
+- two [link](/x)
+"""
+
+
+class TestProfile(unittest.TestCase):
+    def test_profiled_tree_matches_markdown_to_html_node(self):
+        page = PageProfile("page.md")
+        self.assertEqual(
+            profile_markdown_to_html_node(MARKDOWN, page),
+            markdown_to_html_node(MARKDOWN),
+        )
+
+    def test_counts_nodes(self):
+        page = PageProfile("page.md")
+        profile_markdown_to_html_node(MARKDOWN, page)
+        self.assertEqual(
+            page.counts,
+            {"TextNode": 9, "BlockNode": 5, "LeafNode": 9, "ParentNode": 6},
+        )
+
+    def test_records_every_parse_stage(self):
+        page = PageProfile("page.md")
+        profile_markdown_to_html_node(MARKDOWN, page)
+        for name in ["block_split", "block_parse", "inline_parse", "html_tree"]:
+            self.assertGreater(page.stages[name], 0)
+        self.assertEqual(list(page.stages), STAGES)
+
+    def test_report(self):
+        profile = BuildProfile()
+        slow = PageProfile("slow.md")
+        slow.stages["write"] = 2.0
+        slow.output_bytes = 10
+        fast = PageProfile("fast.md")
+        fast.stages["write"] = 1.0
+        fast.output_bytes = 5
+        fast.count_cache("inline", 3, 1)
+        slow.count_cache("inline", 1, 2)
+        profile.add(fast)
+        profile.add(slow)
+        profile.skipped = 3
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "report.json")
+            report = profile.write_report(path, top=1)
+            self.assertTrue(os.path.exists(path))
+        self.assertEqual(report["pages_rendered"], 2)
+        self.assertEqual(report["pages_skipped"], 3)
+        self.assertEqual(report["stages"]["write"], 3.0)
+        self.assertEqual(report["output_bytes"], 15)
+        self.assertEqual(report["caches"], {"inline": {"hits": 4, "misses": 3}})
+        self.assertEqual([page["source"] for page in report["slowest"]], ["slow.md"])
+        summary = format_summary(report)
+        self.assertIn("slow.md (mostly write)", summary)
+        self.assertIn("inline cache: 4 hits, 3 misses", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import io
+import unittest
+
+from build.render import PageRenderer
+from build.template import Template
+from markdown.parse_block_markdown import iter_blocks
+
+MARKDOWN = """# Title
+
+Some **bold** text with a [link](/blog/tom)
+
+```
+code
+
+with an empty line
+```
+
+- one
+- two ![pic](/images/a.png)
+"""
+
+
+class TestPageRenderer(unittest.TestCase):
+    def setUp(self):
+        template = Template.compile(
+            "<title>{{ Title }}</title><main>{{ Content }}</main>", "/site/"
+        )
+        self.renderer = PageRenderer(template, "/site/")
+
+    def test_write_streamed_matches_render(self):
+        block_nodes = self.renderer.parse(MARKDOWN)
+        expected = self.renderer.render(MARKDOWN, block_nodes)
+        visited = []
+        stream = io.StringIO()
+        lines = io.StringIO(MARKDOWN)
+        self.renderer.write_streamed(stream, iter_blocks(lines), visited.append)
+        self.assertEqual(stream.getvalue(), expected)
+        self.assertEqual(visited, block_nodes)
+        self.assertIn('<a href="/site/blog/tom">', expected)
+
+    def test_front_matter_is_not_rendered(self):
+        md = "---\ntitle: Front\n---\n" + MARKDOWN
+        html = self.renderer.render(md, self.renderer.parse(md))
+        self.assertTrue(html.startswith("<title>Front</title><main><div><h1>Title"))
+
+    def test_urls_in_code_are_not_rewritten(self):
+        md = '# T\n\n```\n<a href="/x">\n```\n\n`src="/y"` [x](/x)\n'
+        html = self.renderer.render(md, self.renderer.parse(md))
+        self.assertIn('<code><a href="/x">\n</code>', html)
+        self.assertIn('<code>src="/y"</code>', html)
+        self.assertIn('<a href="/site/x">', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import glob
+import json
+import os
+import tempfile
+import unittest
+
+from build.search import SHARDS, PageTerms, SearchIndex, shard_of
+from node.markdownToHtmlNode import markdown_to_block_nodes
+
+
+def terms(markdown):
+    return PageTerms.from_block_nodes(markdown_to_block_nodes(markdown))
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest_dir = os.path.join(self.tmp.name, "docs")
+        self.state_path = os.path.join(self.tmp.name, "cache", "search.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def dest(self, path):
+        return os.path.join(self.dest_dir, path)
+
+    def load(self):
+        return SearchIndex.load(self.dest_dir, "/site/", self.state_path)
+
+    def published(self):
+        # {token: sorted [(url, weight, positions...)]}
+        search_dir = os.path.join(self.dest_dir, "search")
+        with open(os.path.join(search_dir, "pages.json")) as f:
+            pages = json.load(f)["pages"]
+        tokens = {}
+        for path in glob.glob(os.path.join(search_dir, "[0-9a-f][0-9a-f].json")):
+            with open(path) as f:
+                for token, postings in json.load(f).items():
+                    self.assertEqual(shard_of(token), int(path[-7:-5], 16))
+                    tokens[token] = sorted(
+                        (pages[posting[0]][0], *posting[1:]) for posting in postings
+                    )
+        return tokens
+
+    def test_shard_of_is_fnv1a(self):
+        self.assertEqual(shard_of(""), 0x811C9DC5 % SHARDS)
+        self.assertEqual(shard_of("a"), 0xE40C292C % SHARDS)
+
+    def test_page_terms(self):
+        page = terms("# The Ring\n\nThe ring was **forged**\n\n## Forged")
+        self.assertEqual(page.title, "The Ring")
+        self.assertEqual(page.postings["ring"], [9, 1, 3])
+        self.assertEqual(page.postings["forged"], [5, 5, 6])
+        self.assertEqual(page.postings["the"], [9, 0, 2])
+
+    def test_positions_are_capped(self):
+        page = terms("# T\n\n" + "word " * 20)
+        self.assertEqual(page.postings["word"][0], 20)
+        self.assertEqual(len(page.postings["word"]), 9)
+
+    def test_incremental_update_matches_full_build(self):
+        index = self.load()
+        index.update(
+            "a.md", self.dest("a/index.html"), terms("# Alpha\n\nshared words")
+        )
+        index.update("b.md", self.dest("b/index.html"), terms("# Beta\n\nshared"))
+        index.update("c.md", self.dest("c.html"), terms("# Gamma\n\nwords"))
+        index.save()
+
+        index = self.load()
+        index.update("b.md", self.dest("b/index.html"), terms("# Beta\n\nchanged"))
+        index.retain({"b.md", "c.md"})
+        index.update("d.md", self.dest("d/index.html"), terms("# Delta\n\nshared"))
+        index.save()
+        incremental = self.published()
+
+        for path in glob.glob(os.path.join(self.dest_dir, "search", "*")):
+            os.remove(path)
+        index = self.load()
+        self.assertNotIn("b.md", index)
+        index.update("b.md", self.dest("b/index.html"), terms("# Beta\n\nchanged"))
+        index.update("c.md", self.dest("c.html"), terms("# Gamma\n\nwords"))
+        index.update("d.md", self.dest("d/index.html"), terms("# Delta\n\nshared"))
+        index.save()
+        self.assertEqual(incremental, self.published())
+        self.assertEqual(incremental["shared"], [("/site/d/", 1, 1)])
+        self.assertNotIn("alpha", incremental)
+
+    def test_is_current_compares_the_indexed_hash(self):
+        index = self.load()
+        index.update("a.md", self.dest("a/index.html"), terms("# Alpha"), "h1")
+        index.save()
+        index = self.load()
+        self.assertTrue(index.is_current("a.md", "h1"))
+        self.assertFalse(index.is_current("a.md", "h2"))
+        self.assertFalse(index.is_current("b.md", "h1"))
+
+    def test_page_title_overrides_the_heading(self):
+        index = self.load()
+        page = terms("# Heading\n\ntext")
+        index.update("a.md", self.dest("a/index.html"), page, title="Front matter")
+        index.update("b.md", self.dest("b/index.html"), terms("# Beta"))
+        index.save()
+        with open(os.path.join(self.dest_dir, "search", "pages.json")) as f:
+            pages = json.load(f)["pages"]
+        self.assertEqual(pages, [["/site/a/", "Front matter"], ["/site/b/", "Beta"]])
+
+    def test_removed_page_ids_are_reused(self):
+        index = self.load()
+        index.update("a.md", self.dest("a/index.html"), terms("# Alpha"))
+        index.update("b.md", self.dest("b/index.html"), terms("# Beta"))
+        index.save()
+        index = self.load()
+        index.remove("a.md")
+        index.update("c.md", self.dest("c/index.html"), terms("# Gamma"))
+        index.save()
+        with open(os.path.join(self.dest_dir, "search", "pages.json")) as f:
+            pages = json.load(f)["pages"]
+        self.assertEqual(pages, [["/site/c/", "Gamma"], ["/site/b/", "Beta"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from build.server import (
+    SOCKET_PATH,
+    find_socket,
+    is_serving,
+    send_request,
+    serve_requests,
+)
+
+
+class TestServer(unittest.TestCase):
+    def test_requests_are_answered_until_stop(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "build.sock")
+            requests = []
+
+            def handle(request):
+                requests.append(request)
+                return {"ok": True, "echo": request.get("paths")}
+
+            thread = threading.Thread(target=serve_requests, args=(handle, path))
+            thread.start()
+            try:
+                for _ in range(100):
+                    if is_serving(path):
+                        break
+                    thread.join(0.01)
+                response = send_request({"command": "rebuild", "paths": ["a"]}, path)
+                self.assertEqual(response, {"ok": True, "echo": ["a"]})
+                with self.assertRaises(OSError):
+                    serve_requests(handle, path)
+            finally:
+                send_request({"command": "stop"}, path)
+                thread.join()
+            self.assertFalse(os.path.exists(path))
+            self.assertEqual([r["command"] for r in requests], ["rebuild", "stop"])
+
+    def test_find_socket_searches_parent_directories(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            subdir = os.path.join(tmp, "content", "blog")
+            os.makedirs(subdir)
+            self.assertEqual(find_socket(subdir), SOCKET_PATH)
+            path = os.path.join(tmp, SOCKET_PATH)
+            os.makedirs(os.path.dirname(path))
+            open(path, "w").close()
+            self.assertEqual(find_socket(subdir), path)
+            self.assertEqual(find_socket(tmp), path)
+
+
+if __name__ == "__main__":
+    unittest.main()
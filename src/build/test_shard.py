@@ -0,0 +1,76 @@
+import argparse
+import os
+import tempfile
+import unittest
+
+from build.depgraph import DependencyGraph
+from build.manifest import Manifest
+from build.shard import merge_shards, parse_shard, select_shard, shard_of, shard_paths
+
+
+class TestShard(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = os.path.join(self.tmp.name, "shards")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_shard(self, index, count, pages, assets=None):
+        manifest_path, graph_path = shard_paths(index, count, self.dir)
+        manifest = Manifest(manifest_path, {"basepath": "/"}, {}, assets or {})
+        graph = DependencyGraph(graph_path, "docs")
+        for source, dest in pages.items():
+            manifest.record(source, "h", dest)
+            graph.record(dest, [source, "template.html"])
+        manifest.save()
+        graph.save()
+
+    def merge(self):
+        tmp = self.tmp.name
+        return merge_shards(
+            "docs", self.dir, os.path.join(tmp, "m.json"), os.path.join(tmp, "g.json")
+        )
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/3"), (2, 3))
+        for value in ["0/3", "4/3", "3", "a/b"]:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_shard(value)
+
+    def test_shards_partition_pages(self):
+        pages = [
+            (f"content/p{i}/index.md", f"docs/p{i}/index.html") for i in range(100)
+        ]
+        shards = [select_shard(pages, i, 4) for i in range(1, 5)]
+        self.assertEqual(sorted(sum(shards, [])), sorted(pages))
+        self.assertTrue(all(shards))
+        # stable across runs and path spellings
+        self.assertEqual(shard_of("content/a.md", 7), shard_of("content/./a.md", 7))
+        self.assertEqual(shard_of("content/a.md", 7), 5)
+
+    def test_merge(self):
+        assets = {"docs/a.png": "static/a.png"}
+        self.write_shard(1, 2, {"content/a.md": "docs/a.html"}, assets)
+        self.write_shard(2, 2, {"content/b.md": "docs/b.html"}, assets)
+        manifest, graph = self.merge()
+        self.assertEqual(sorted(manifest.pages), ["content/a.md", "content/b.md"])
+        self.assertEqual(manifest.assets, assets)
+        self.assertEqual(
+            graph.affected("template.html"), ["docs/a.html", "docs/b.html"]
+        )
+
+    def test_merge_reports_collisions(self):
+        self.write_shard(1, 2, {"content/a.md": "docs/a.html"})
+        self.write_shard(2, 2, {"content/a/index.md": "docs/a.html"})
+        with self.assertRaisesRegex(ValueError, "both write docs/a.html"):
+            self.merge()
+
+    def test_merge_needs_every_shard(self):
+        self.write_shard(1, 3, {"content/a.md": "docs/a.html"})
+        with self.assertRaisesRegex(ValueError, "missing shards 2, 3 of 3"):
+            self.merge()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import io
+import unittest
+
+from build.template import Template, UrlRewriter
+
+
+class TestTemplate(unittest.TestCase):
+    def test_compile_splits_segments_and_slots(self):
+        template = Template.compile("<title>{{ Title }}</title>{{ Content }}!")
+        self.assertEqual(
+            template.segments,
+            ["<title>", "{{ Title }}", "</title>", "{{ Content }}", "!"],
+        )
+        self.assertEqual(template.slots, {1: "Title", 3: "Content"})
+
+    def test_render(self):
+        template = Template.compile("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(
+            template.render(Title="Hi", Content="<p>body</p>"),
+            "<title>Hi</title><p>body</p>",
+        )
+
+    def test_render_keeps_unknown_slots(self):
+        template = Template.compile("{{ Title }} {{ Author }}")
+        self.assertEqual(template.render(Title="Hi"), "Hi {{ Author }}")
+
+    def test_render_does_not_expand_slots_in_values(self):
+        template = Template.compile("{{ Title }}|{{ Content }}")
+        self.assertEqual(
+            template.render(Title="{{ Content }}", Content="x"), "{{ Content }}|x"
+        )
+
+    def test_write_streams_fragments(self):
+        template = Template.compile("<title>{{ Title }}</title>{{ Content }}")
+        stream = io.StringIO()
+        template.write(stream, Title="Hi", Content=iter(["<p>", "body", "</p>"]))
+        self.assertEqual(stream.getvalue(), "<title>Hi</title><p>body</p>")
+
+    def test_render_joins_fragments(self):
+        template = Template.compile("{{ Content }}")
+        self.assertEqual(template.render(Content=["<p>", "</p>"]), "<p></p>")
+
+    def test_compile_rewrites_root_links(self):
+        template = Template.compile(
+            '<link href="/index.css" /><img src="/logo.png" /><a href="https://x">',
+            "/blog/",
+        )
+        self.assertEqual(
+            template.render(),
+            '<link href="/blog/index.css" /><img src="/blog/logo.png" /><a href="https://x">',
+        )
+
+    def test_compile_rewrites_urls(self):
+        template = Template.compile(
+            '<link href="/index.css" /><a href="/">{{ Title }}</a>',
+            "/blog/",
+            rewrite_url=lambda url: {"/index.css": "/index.123.css"}.get(url, url),
+        )
+        self.assertEqual(
+            template.render(Title="t"),
+            '<link href="/blog/index.123.css" /><a href="/blog/">t</a>',
+        )
+
+    def test_digest_covers_compiled_urls(self):
+        text = '<link href="/index.css" />{{ Content }}'
+        self.assertEqual(
+            Template.compile(text).digest(), Template.compile(text).digest()
+        )
+        self.assertNotEqual(
+            Template.compile(text).digest(), Template.compile(text, "/blog/").digest()
+        )
+
+    def test_compile_keeps_protocol_relative_urls(self):
+        text = '<script src="//cdn.example/x.js"></script>'
+        self.assertEqual(Template.compile(text, "/blog/").render(), text)
+
+    def test_url_rewriter(self):
+        rewriter = UrlRewriter("/blog/", {"/a.png": "/a.1.png"}.get)
+        self.assertEqual(rewriter("/a.png"), "/blog/a.1.png")
+        self.assertEqual(rewriter("https://x/a.png"), "https://x/a.png")
+        self.assertEqual(rewriter("a.png"), "a.png")
+        self.assertTrue(UrlRewriter().is_identity())
+        self.assertFalse(rewriter.is_identity())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from build.watch import InotifyWatcher, PollingWatcher
+
+
+class WatcherTests:
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        self.write(self.template, "{{ Content }}")
+        self.watcher = self.create_watcher([self.content], [self.template])
+        self.addCleanup(self.watcher.close)
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_reports_modified_file(self):
+        page = os.path.join(self.content, "blog", "index.md")
+        self.write(page, "# Blog!")
+        self.assertEqual(self.watcher.wait(1), {page})
+
+    def test_reports_removed_file(self):
+        page = os.path.join(self.content, "blog", "index.md")
+        os.remove(page)
+        self.assertEqual(self.watcher.wait(1), {page})
+
+    def test_reports_files_in_new_directory(self):
+        page = os.path.join(self.content, "new", "index.md")
+        os.makedirs(os.path.dirname(page))
+        self.write(page, "# New")
+        self.assertIn(page, self.watcher.wait(1))
+
+    def test_reports_watched_file_only(self):
+        self.write(os.path.join(self.tmp.name, "notes.txt"), "ignored")
+        self.write(self.template, "<main>{{ Content }}</main>")
+        self.assertEqual(self.watcher.wait(1), {self.template})
+
+    def test_timeout_without_changes(self):
+        self.assertEqual(self.watcher.wait(0.05), set())
+
+
+class TestPollingWatcher(WatcherTests, unittest.TestCase):
+    def create_watcher(self, dirs, files):
+        return PollingWatcher(dirs, files, interval=0.01)
+
+    def write(self, path, text):
+        super().write(path, text)
+        # make the change visible to mtime comparison on coarse filesystems
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestInotifyWatcher(WatcherTests, unittest.TestCase):
+    def create_watcher(self, dirs, files):
+        try:
+            return InotifyWatcher(dirs, files)
+        except OSError:
+            self.skipTest("inotify is not available")
+
+
+if __name__ == "__main__":
+    unittest.main()
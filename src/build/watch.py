@@ -0,0 +1,176 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+# events arriving this soon after the first one are folded into the same
+# batch, so a save that touches a file several times triggers one rebuild
+DEBOUNCE_SECONDS = 0.01
+
+
+def create_watcher(dirs, files=(), poll_interval=0.25):
+    try:
+        return InotifyWatcher(dirs, files)
+    except OSError:
+        return PollingWatcher(dirs, files, poll_interval)
+
+
+class InotifyWatcher:
+    def __init__(self, dirs, files=()):
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        # directories watched only for the single files in them, as opposed
+        # to directories whose whole tree is watched
+        self.file_watches = set()
+        self.files = {os.path.normpath(path) for path in files}
+        for directory in {os.path.dirname(path) or "." for path in self.files}:
+            self.file_watches.add(self._add_watch(directory))
+        for directory in dirs:
+            self._add_tree(directory)
+
+    def _add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"cannot watch {directory}")
+        self.watches[wd] = os.path.normpath(directory)
+        return wd
+
+    def _add_tree(self, directory):
+        self.file_watches.discard(self._add_watch(directory))
+        for dirpath, dirnames, _ in os.walk(directory):
+            for dirname in dirnames:
+                self.file_watches.discard(
+                    self._add_watch(os.path.join(dirpath, dirname))
+                )
+
+    def wait(self, timeout=None):
+        # returns the set of changed paths, or None when events were lost and
+        # the caller has to rescan everything
+        changed = set()
+        overflow = False
+        deadline = None
+        while True:
+            remaining = timeout
+            if deadline is not None:
+                remaining = max(0, deadline - time.monotonic())
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if not readable:
+                break
+            overflow |= self._read_events(changed)
+            if deadline is None:
+                deadline = time.monotonic() + DEBOUNCE_SECONDS
+        return None if overflow else changed
+
+    def _read_events(self, changed):
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        overflow = False
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.normpath(os.path.join(directory, os.fsdecode(name)))
+            if wd in self.file_watches and path not in self.files:
+                continue
+            if mask & IN_ISDIR:
+                if mask & IN_MOVED_FROM:
+                    # a moved-away directory reports no events for its files
+                    overflow = True
+                elif mask & (IN_CREATE | IN_MOVED_TO):
+                    # files may land in a new directory before it is watched
+                    self._add_tree(path)
+                    changed.update(walk_files(path))
+                continue
+            changed.add(path)
+        return overflow
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    def __init__(self, dirs, files=(), interval=0.25):
+        self.dirs = list(dirs)
+        self.files = [os.path.normpath(path) for path in files]
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        paths = self.files + [
+            path for directory in self.dirs for path in walk_files(directory)
+        ]
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self.snapshot.keys()
+                if snapshot.get(path) != self.snapshot.get(path)
+            }
+            self.snapshot = snapshot
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return changed
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+def walk_files(directory):
+    for dirpath, _, filenames in os.walk(directory):
+        for filename in filenames:
+            yield os.path.normpath(os.path.join(dirpath, filename))
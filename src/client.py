@@ -0,0 +1,51 @@
+import argparse
+import os
+import sys
+
+from build.server import find_socket, send_request
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Ask a running `main.py --serve` build server to rebuild"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="changed content, static or template files (default: rebuild all)",
+    )
+    parser.add_argument(
+        "--socket",
+        default=None,
+        help="default: the build server of the site the current directory is in",
+    )
+    parser.add_argument("--stop", action="store_true", help="shut the server down")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.socket is None:
+        args.socket = find_socket()
+    if args.stop:
+        request = {"command": "stop"}
+    else:
+        request = {"command": "rebuild"}
+        if args.paths:
+            # the server resolves paths against its own directory
+            request["paths"] = [os.path.abspath(path) for path in args.paths]
+    try:
+        response = send_request(request, args.socket)
+    except OSError as e:
+        sys.exit(f"No build server on {args.socket} ({e}); start one with --serve")
+    if not response["ok"]:
+        sys.exit(f"Build failed: {response['error']}")
+    if "rendered" in response:
+        print(
+            f"Rendered {response['rendered']} pages "
+            f"in {response['milliseconds']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
+import sys
+
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        self.tag = tag if tag is None else sys.intern(tag)
         self.value = value
         self.children = (
             children if children is None or isinstance(children, list) else [children]
@@ -10,6 +15,13 @@ class HTMLNode:
     def to_html(self):
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def iter_html(self):
+        yield self.to_html()
+
+    def write_html(self, stream):
+        for fragment in self.iter_html():
+            stream.write(fragment)
+
     def props_to_html(self):
         if self.props is None:
             return ""
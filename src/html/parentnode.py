@@ -2,18 +2,43 @@ from html.htmlnode import HTMLNode
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag=tag, children=children, props=props)
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        # explicit stack rather than recursion, so arbitrarily deep trees
+        # cannot hit the recursion limit; closing tags are pushed as strings
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            elif not isinstance(node, ParentNode):
+                yield node.to_html()
+            else:
+                open_tag = node.open_tag()
+                if ParentNode in map(type, node.children):
+                    yield open_tag
+                    stack.append(f"</{node.tag}>")
+                    stack.extend(reversed(node.children))
+                    continue
+                # only leaves below: serialize the whole node in one piece
+                children_html = "".join([child.to_html() for child in node.children])
+                yield f"{open_tag}{children_html}</{node.tag}>"
+
+    def open_tag(self):
         if self.tag is None:
             raise ValueError("Tag is required")
 
         if self.children is None:
             raise ValueError("Children are required")
 
-        children_html = "".join([child.to_html() for child in self.children])
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>"
 
     def __repr__(self):
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
@@ -1,3 +1,4 @@
+import io
 import unittest
 
 from html.leafnode import LeafNode
@@ -60,6 +61,35 @@ class TestLeafNode(unittest.TestCase):
             '<div class="container" id="main"><a href="https://www.google.com">Click me!</a></div>',
         )
 
+    def test_iter_html(self):
+        grandchild_node = LeafNode("b", "grandchild")
+        child_node = ParentNode("span", [grandchild_node, LeafNode(None, "text")])
+        parent_node = ParentNode("div", [child_node])
+        self.assertEqual(
+            list(parent_node.iter_html()),
+            ["<div>", "<span><b>grandchild</b>text</span>", "</div>"],
+        )
+
+    def test_to_html_deeply_nested(self):
+        node = LeafNode("b", "deep")
+        for _ in range(100_000):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<div><div>"))
+        self.assertEqual(len(html), 100_000 * len("<div></div>") + len("<b>deep</b>"))
+
+    def test_iter_html_without_tag(self):
+        parent_node = ParentNode(None, [LeafNode("span", "child")])
+        with self.assertRaises(ValueError):
+            list(parent_node.iter_html())
+
+    def test_write_html(self):
+        child_node = LeafNode("a", "Click me!", {"href": "https://www.google.com"})
+        parent_node = ParentNode("div", [ParentNode("p", [child_node])])
+        stream = io.StringIO()
+        parent_node.write_html(stream)
+        self.assertEqual(stream.getvalue(), parent_node.to_html())
+
 
 if __name__ == "__main__":
     unittest.main()
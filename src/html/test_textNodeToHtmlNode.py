@@ -5,7 +5,7 @@ from html.leafnode import LeafNode
 from html.parentnode import ParentNode
 from html.textNodeToHtmlNode import block_node_to_html_node, text_node_to_html_node
 from node.blocknode import BlockNode, BlockType
-from node.textnode import TextNode, TextType
+from node.textnode import NEWLINE, TextNode, TextType
 
 
 class TestTextNodeToHtmlNode(unittest.TestCase):
@@ -63,6 +63,24 @@ class TestTextNodeToHtmlNode(unittest.TestCase):
             '<img src="https://www.google.com" alt="This is a image node" />',
         )
 
+    def test_rewrite_url(self):
+        rewrite_url = {"/a.png": "/a.123.png", "/about": "/site/about"}.get
+        image = TextNode("alt", TextType.IMAGE, "/a.png")
+        link = TextNode("about", TextType.LINK, "/about")
+        self.assertEqual(
+            text_node_to_html_node(image, rewrite_url).to_html(),
+            '<img src="/a.123.png" alt="alt" />',
+        )
+        self.assertEqual(
+            text_node_to_html_node(link, rewrite_url).to_html(),
+            '<a href="/site/about">about</a>',
+        )
+
+    def test_newline_is_shared(self):
+        html_node = text_node_to_html_node(NEWLINE)
+        self.assertIs(html_node, text_node_to_html_node(NEWLINE))
+        self.assertEqual(html_node.to_html(), "\n")
+
 
 class TestBlockNodeToHtmlNode(unittest.TestCase):
     def test_empty(self):
@@ -303,3 +321,12 @@ class TestBlockNodeToHtmlNode(unittest.TestCase):
             html_node.to_html(),
             "<ol><li>This is a ordered list</li><li>with multiple items</li></ol>",
         )
+
+    def test_deeply_nested_list(self):
+        node = BlockNode(
+            [TextNode("leaf", TextType.TEXT)], BlockType.UNORDERED_LIST_ITEM
+        )
+        for _ in range(10_000):
+            node = BlockNode([node], BlockType.UNORDERED_LIST)
+        html = block_node_to_html_node(node).to_html()
+        self.assertEqual(html, "<ul>" * 10_000 + "<li>leaf</li>" + "</ul>" * 10_000)
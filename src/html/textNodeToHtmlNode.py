@@ -5,10 +5,15 @@ from markdown.parse_block_markdown import (
     block_to_block_type,
     extract_markdown,
 )
-from node.textnode import TextType
+from node.textnode import NEWLINE, TextType
 
+NEWLINE_LEAF = LeafNode(None, "\n")
 
-def text_node_to_html_node(text_node):
+
+def text_node_to_html_node(text_node, rewrite_url=None):
+    # rewrite_url, if given, maps every link and image url
+    if text_node is NEWLINE:
+        return NEWLINE_LEAF
     match text_node.text_type:
         case TextType.TEXT:
             return LeafNode(None, text_node.text)
@@ -19,72 +24,57 @@ def text_node_to_html_node(text_node):
         case TextType.CODE:
             return LeafNode("code", text_node.text)
         case TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
+            url = text_node.url if rewrite_url is None else rewrite_url(text_node.url)
+            return LeafNode("a", text_node.text, {"href": url})
         case TextType.IMAGE:
+            url = text_node.url if rewrite_url is None else rewrite_url(text_node.url)
             return LeafNode(
                 "img",
                 "",
                 {
-                    "src": text_node.url,
+                    "src": url,
                     "alt": text_node.text,
                 },
             )
 
 
-def block_node_to_html_node(block_node):
-    if block_node.block_type == BlockType.HEADING_1:
-        return ParentNode(
-            f"h1", [text_node_to_html_node(child) for child in block_node.children]
-        )
-    elif block_node.block_type == BlockType.HEADING_2:
-        return ParentNode(
-            f"h2", [text_node_to_html_node(child) for child in block_node.children]
-        )
-    elif block_node.block_type == BlockType.HEADING_3:
-        return ParentNode(
-            f"h3", [text_node_to_html_node(child) for child in block_node.children]
-        )
-    elif block_node.block_type == BlockType.HEADING_4:
-        return ParentNode(
-            f"h4", [text_node_to_html_node(child) for child in block_node.children]
-        )
-    elif block_node.block_type == BlockType.HEADING_5:
-        return ParentNode(
-            f"h5", [text_node_to_html_node(child) for child in block_node.children]
-        )
-    elif block_node.block_type == BlockType.HEADING_6:
-        return ParentNode(
-            f"h6", [text_node_to_html_node(child) for child in block_node.children]
-        )
-    elif block_node.block_type == BlockType.CODE:
-        return ParentNode(
-            "pre",
-            ParentNode("code", LeafNode(None, block_node.children[0].text + "\n")),
-        )
-    elif block_node.block_type == BlockType.QUOTE:
-        return ParentNode(
-            "blockquote",
-            [text_node_to_html_node(child) for child in block_node.children],
-        )
-    elif block_node.block_type == BlockType.UNORDERED_LIST:
-        return ParentNode(
-            "ul",
-            [block_node_to_html_node(child) for child in block_node.children],
-        )
-    elif block_node.block_type == BlockType.UNORDERED_LIST_ITEM:
-        return ParentNode(
-            "li", [text_node_to_html_node(child) for child in block_node.children]
-        )
-    elif block_node.block_type == BlockType.ORDERED_LIST:
-        return ParentNode(
-            "ol",
-            [block_node_to_html_node(child) for child in block_node.children],
-        )
-    elif block_node.block_type == BlockType.ORDERED_LIST_ITEM:
-        return ParentNode(
-            "li", [text_node_to_html_node(child) for child in block_node.children]
-        )
-    else:
-        return ParentNode(
-            "p", [text_node_to_html_node(child) for child in block_node.children]
-        )
+BLOCK_TAGS = {
+    BlockType.HEADING_1: "h1",
+    BlockType.HEADING_2: "h2",
+    BlockType.HEADING_3: "h3",
+    BlockType.HEADING_4: "h4",
+    BlockType.HEADING_5: "h5",
+    BlockType.HEADING_6: "h6",
+    BlockType.QUOTE: "blockquote",
+    BlockType.UNORDERED_LIST: "ul",
+    BlockType.UNORDERED_LIST_ITEM: "li",
+    BlockType.ORDERED_LIST: "ol",
+    BlockType.ORDERED_LIST_ITEM: "li",
+}
+CONTAINER_TYPES = {BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST}
+
+
+def block_node_to_html_node(block_node, rewrite_url=None):
+    # explicit stack rather than recursion: list items get a placeholder in
+    # their list's children that is filled in when they are popped
+    root = [None]
+    stack = [(block_node, root, 0)]
+    while stack:
+        node, siblings, index = stack.pop()
+        if node.block_type == BlockType.CODE:
+            html_node = ParentNode(
+                "pre",
+                ParentNode("code", LeafNode(None, node.children[0].text + "\n")),
+            )
+        elif node.block_type in CONTAINER_TYPES:
+            children = [None] * len(node.children)
+            for i, child in enumerate(node.children):
+                stack.append((child, children, i))
+            html_node = ParentNode(BLOCK_TAGS[node.block_type], children)
+        else:
+            html_node = ParentNode(
+                BLOCK_TAGS.get(node.block_type, "p"),
+                [text_node_to_html_node(child, rewrite_url) for child in node.children],
+            )
+        siblings[index] = html_node
+    return root[0]
@@ -1,70 +1,615 @@
+import argparse
 import os
 import pathlib
 import re
-import shutil
 import sys
-from markdown.parse_block_markdown import extract_markdown, extract_title
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from build.assets import copy_file, needs_copy, sync_folder
+from build.astcache import AstCache
+from build.compress import compress_outputs, remove_outdated
+from build.depgraph import GRAPH_PATH, DependencyGraph
+from build.feeds import write_feed, write_sitemap
+from build.fingerprint import AssetUrls, fingerprint_folder
+from build.manifest import MANIFEST_PATH, Manifest, hash_bytes, hash_file
+from build.output import open_if_changed, write_if_changed
+from build.profile import (
+    REPORT_PATH,
+    BuildProfile,
+    PageProfile,
+    format_summary,
+    stage,
+)
+from build.render import PageRenderer
+from build.search import SearchIndex
+from build.server import SOCKET_PATH, serve_requests
+from build.shard import SHARD_DIR, merge_shards, parse_shard, select_shard, shard_paths
+from build.state import BuildState, PageFacts
+from build.template import Template
+from build.watch import create_watcher
+from markdown.metadata import page_title, split_front_matter_lines
+from markdown.parse_block_markdown import extract_markdown, iter_blocks
+from markdown.parse_inline_markdown import InlineCache
 from node.blocknode import BlockType
-from node.markdownToHtmlNode import markdown_to_html_node
-
-
-def main():
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
-    dest_path = "docs"
-    copy_folder("static", dest_path)
-    generate_page_recursive("content", "template.html", dest_path, basepath)
-
-
-def copy_folder(src, dest):
-    if os.path.exists(dest):
-        shutil.rmtree(dest)
-    if not os.path.exists(dest):
-        os.mkdir(dest)
-    for item in os.listdir(src):
-        s = os.path.join(src, item)
-        d = os.path.join(dest, item)
-        if os.path.isdir(s):
-            copy_folder(s, d)
+
+CONTENT_DIR = "content"
+STATIC_DIR = "static"
+TEMPLATE_PATH = "template.html"
+DEST_DIR = "docs"
+FEED_SECTION = os.path.join(CONTENT_DIR, "blog")
+FEED_PATH = os.path.join(DEST_DIR, "blog", "atom.xml")
+SITEMAP_PATH = os.path.join(DEST_DIR, "sitemap.xml")
+# parsed pages a build server keeps in memory
+SERVE_MEMORY_ENTRIES = 4096
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site into docs/")
+    parser.add_argument("basepath", nargs="?", default="/")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes rendering pages (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--link-assets",
+        action="store_true",
+        help="hardlink static files into docs/ instead of copying them",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare static files by content hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and rebuild outputs affected by each change",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=REPORT_PATH,
+        metavar="REPORT",
+        help=f"time every page and stage and write a JSON report (default {REPORT_PATH})",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        metavar="N",
+        help="number of slowest pages listed in the profile summary",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=float,
+        default=256,
+        metavar="MB",
+        help="size limit of the parsed page cache in .build_cache/ast (0 disables it)",
+    )
+    parser.add_argument(
+        "--inline-cache",
+        type=int,
+        default=0,
+        metavar="N",
+        help="reuse the inline parse of up to N repeated text blocks",
+    )
+    parser.add_argument(
+        "--affected",
+        metavar="PATH",
+        help="list the outputs the last build made from PATH and the pages "
+        "linking to them, without building",
+    )
+    parser.add_argument(
+        "--stream-threshold",
+        type=float,
+        default=16,
+        metavar="MB",
+        help="render pages larger than this block by block as they are read",
+    )
+    parser.add_argument(
+        "--gzip",
+        nargs="?",
+        type=int,
+        choices=range(1, 10),
+        const=9,
+        metavar="LEVEL",
+        help="write a .gz next to every changed html, css, js and svg output "
+        "(compression level 1-9, default 9)",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a sharded full-text search index to docs/search",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="copy static files to name.<hash>.ext and point links at the copies",
+    )
+    parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help="absolute url of the site, e.g. https://example.com; writes "
+        f"{SITEMAP_PATH} and an Atom feed of {FEED_SECTION}/ to {FEED_PATH}",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="render only the I-th of N stable parts of the pages, keeping a "
+        f"partial manifest in {SHARD_DIR}; combine the shards with `merge`",
+    )
+    parser.add_argument(
+        "--serve",
+        nargs="?",
+        const=SOCKET_PATH,
+        metavar="SOCKET",
+        help="after building, keep the build state in memory and rebuild on "
+        f"requests from client.py over a Unix socket (default {SOCKET_PATH})",
+    )
+    args = parser.parse_args(argv)
+    if args.serve and args.watch:
+        parser.error("--serve cannot be combined with --watch")
+    if args.shard is not None and (args.search or args.watch or args.serve):
+        # each needs every page; rebuilds would also record other shards' pages
+        parser.error("--shard cannot be combined with --search, --watch or --serve")
+    return args
+
+
+def parse_merge_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py merge",
+        description="Combine the manifests of a sharded build, checking that no "
+        "two shards wrote the same output",
+    )
+    parser.add_argument(
+        "--shards",
+        default=SHARD_DIR,
+        metavar="DIR",
+        help=f"directory holding the manifests of every shard (default {SHARD_DIR})",
+    )
+    parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help=f"also write {SITEMAP_PATH} and {FEED_PATH} for the whole site",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["merge"]:
+        merge(parse_merge_args(argv[1:]))
+        return
+    args = parse_args(argv)
+    manifest_path, graph_path = MANIFEST_PATH, GRAPH_PATH
+    if args.shard is not None:
+        manifest_path, graph_path = shard_paths(*args.shard)
+    graph = DependencyGraph.load(DEST_DIR, graph_path)
+    if args.affected:
+        print_affected(graph, os.path.normpath(args.affected))
+        return
+    search = SearchIndex.load(DEST_DIR, args.basepath) if args.search else None
+    state = BuildState(Manifest.load(manifest_path), graph, search)
+    renderer = build(args, state)
+    if args.watch:
+        watch(args, state, renderer)
+    if args.serve:
+        serve(args, state, renderer)
+
+
+def create_renderer(args, rewrite_url=None, previous=None):
+    # previous: the renderer being replaced, whose caches live on
+    template = Template.load(TEMPLATE_PATH, args.basepath, rewrite_url)
+    if previous is not None:
+        ast_cache, inline_cache = previous.ast_cache, previous.inline_cache
+    else:
+        ast_cache = None
+        if args.cache_size:
+            # a server keeps the trees of recently rendered pages in memory too
+            memory_entries = SERVE_MEMORY_ENTRIES if args.serve else 0
+            ast_cache = AstCache(
+                max_bytes=int(args.cache_size * 1e6), memory_entries=memory_entries
+            )
+        inline_cache = InlineCache(args.inline_cache) if args.inline_cache else None
+    stream_threshold = int(args.stream_threshold * 1e6)
+    return PageRenderer(
+        template, args.basepath, ast_cache, inline_cache, stream_threshold, rewrite_url
+    )
+
+
+def build(args, state, previous=None):
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    manifest = state.manifest
+    fingerprints = fingerprint_folder(STATIC_DIR) if args.fingerprint else None
+    if fingerprints is not None:
+        state.rewrite_url = AssetUrls(fingerprints, STATIC_DIR)
+    renderer = create_renderer(args, state.rewrite_url, previous)
+    previous_inputs = manifest.inputs
+    manifest.begin_build(template=renderer.template.digest(), basepath=args.basepath)
+    state.profile = BuildProfile() if args.profile else None
+    previous_assets = set(manifest.assets)
+    sync_folder(
+        STATIC_DIR, DEST_DIR, manifest, args.link_assets, args.checksum, fingerprints
+    )
+    if fingerprints is not None:
+        # pages linking to a replaced copy must be rendered again
+        for dest in previous_assets - manifest.seen_assets:
+            state.stale_outputs.update(state.graph.referencing(dest))
+    for dest, source in manifest.assets.items():
+        state.graph.record(dest, [source])
+    pages = collect_pages(CONTENT_DIR, DEST_DIR)
+    if args.shard is not None:
+        pages = select_shard(pages, *args.shard)
+    try:
+        if jobs > 1:
+            generate_pages_parallel(pages, renderer, jobs, state)
         else:
-            shutil.copy(s, d)
+            for from_path, dest_path in pages:
+                generate_page(from_path, renderer, dest_path, state)
+    except Exception:
+        # nothing is saved, but a later build in this process must not take
+        # the pages rendered with the previous inputs for fresh
+        manifest.inputs = previous_inputs
+        raise
+    for removed in manifest.remove_stale():
+        print(f"Removed stale page {removed}")
+    for removed in manifest.remove_stale_assets():
+        print(f"Removed stale asset {removed}")
+    # before saving: the manifest remembers the outputs not worth compressing
+    compress_changed(args, state, jobs)
+    state.save()
+    state.stale_outputs = set()
+    if args.shard is None:
+        # a shard only knows its own pages: merge writes the feeds
+        write_feeds(args, state)
+    if renderer.ast_cache is not None:
+        renderer.ast_cache.evict()
+    if state.profile is not None:
+        report = state.profile.write_report(args.profile, args.profile_top)
+        print(format_summary(report))
+        print(f"Wrote build report to {args.profile}")
+        state.profile = None
+    return renderer
+
+
+def watch(args, state, renderer):
+    watcher = create_watcher([CONTENT_DIR, STATIC_DIR], [TEMPLATE_PATH])
+    print(f"Watching {CONTENT_DIR}/, {STATIC_DIR}/ and {TEMPLATE_PATH} for changes")
+    try:
+        while True:
+            changed = watcher.wait()
+            if not changed and changed is not None:
+                continue
+            start = time.perf_counter()
+            state.failed = {}
+            try:
+                renderer = rebuild(changed, args, state, renderer)
+            except Exception as e:
+                # a half-typed save must not end the session: the next
+                # change is rebuilt as usual
+                print(f"Rebuild failed: {type(e).__name__}: {e}")
+                continue
+            for source, error in state.failed.items():
+                print(f"Rebuild of {source} failed: {error}")
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"Rebuilt in {elapsed:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def serve(args, state, renderer):
+    def handle(request):
+        nonlocal renderer
+        command = request.get("command")
+        if command == "stop":
+            return {"ok": True}
+        if command != "rebuild":
+            return {"ok": False, "error": f"unknown command {command!r}"}
+        changed = request.get("paths")
+        if changed is not None:
+            # clients send absolute paths
+            outside = [p for p in changed if not is_site_path(os.path.relpath(p))]
+            changed = {os.path.relpath(p) for p in changed}
+            if outside:
+                return {
+                    "ok": False,
+                    "error": "not a content, static or template file: "
+                    + ", ".join(outside),
+                }
+        start = time.perf_counter()
+        state.rendered = 0
+        state.failed = {}
+        try:
+            renderer = rebuild(changed, args, state, renderer)
+        except Exception as e:
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        if state.failed:
+            # the other pages were rebuilt, with the new renderer if any
+            return {
+                "ok": False,
+                "error": "; ".join(f"{s}: {e}" for s, e in state.failed.items()),
+            }
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Rebuilt in {elapsed:.1f} ms")
+        return {"ok": True, "rendered": state.rendered, "milliseconds": elapsed}
+
+    print(f"Serving builds on {os.path.abspath(args.serve)}")
+    try:
+        serve_requests(handle, args.serve)
+    except KeyboardInterrupt:
+        pass
+
+
+def rebuild(changed, args, state, renderer):
+    # changed: the paths to rebuild, None for everything; returns the
+    # renderer to use from now on. Pages that fail are left in state.failed
+    if changed is None or (
+        args.fingerprint and any(is_inside(p, STATIC_DIR) for p in changed)
+    ):
+        # a new fingerprint changes the template or pages linking to it
+        return build(args, state, renderer)
+    renderer = rebuild_changed(changed, args, state, renderer)
+    compress_changed(args, state)
+    state.save()
+    write_feeds(args, state)
+    return renderer
 
 
-def generate_page_recursive(dir_path_content, template_path, dest_dir_path, basepath):
+def rebuild_changed(changed, args, state, renderer):
+    # returns the renderer to use from now on, a new one if the template changed
+    manifest, graph = state.manifest, state.graph
+    pages = set()
+    if TEMPLATE_PATH in changed:
+        renderer = create_renderer(args, state.rewrite_url, renderer)
+        manifest.begin_build(
+            template=renderer.template.digest(), basepath=args.basepath
+        )
+        pages.update(graph.inputs(dest)[0] for dest in graph.affected(TEMPLATE_PATH))
+    for path in sorted(changed):
+        if is_inside(path, CONTENT_DIR):
+            if os.path.isfile(path):
+                pages.add(path)
+            else:
+                warn_broken_links(graph, path)
+                removed = manifest.remove_page(path)
+                if removed is not None:
+                    print(f"Removed stale page {removed}")
+        elif is_inside(path, STATIC_DIR):
+            dest = os.path.join(DEST_DIR, os.path.relpath(path, STATIC_DIR))
+            if os.path.isfile(path):
+                if needs_copy(path, dest, args.checksum):
+                    os.makedirs(os.path.dirname(dest), exist_ok=True)
+                    copy_file(path, dest, args.link_assets)
+                manifest.record_asset(path, dest)
+                graph.record(dest, [path])
+            else:
+                warn_broken_links(graph, path)
+                if manifest.remove_asset(dest) is not None:
+                    print(f"Removed stale asset {dest}")
+    for path in sorted(pages):
+        dest = page_dest(path, CONTENT_DIR, DEST_DIR)
+        try:
+            generate_page(path, renderer, dest, state)
+        except Exception as e:
+            # one broken page must not keep the others on the old template
+            state.fail(path, dest, e)
+    return renderer
+
+
+def merge(args):
+    try:
+        manifest, graph = merge_shards(DEST_DIR, args.shards)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Cannot merge shards:\n{e}")
+    manifest.save()
+    graph.save()
+    print(
+        f"Merged {len(manifest.pages)} pages and {len(manifest.assets)} assets "
+        f"into {manifest.path}"
+    )
+    args.basepath = manifest.inputs.get("basepath", "/")
+    write_feeds(args, BuildState(manifest, graph))
+
+
+def write_feeds(args, state):
+    if args.site_url is None:
+        return
+    site_url = args.site_url.rstrip("/")
+    pages = state.manifest.pages
+    write_sitemap(SITEMAP_PATH, pages, DEST_DIR, site_url, args.basepath)
+    # the feed is named after the home page
+    home = pages.get(os.path.join(CONTENT_DIR, "index.md"), {})
+    title = home.get("title") or "Blog"
+    write_feed(FEED_PATH, pages, FEED_SECTION, DEST_DIR, site_url, args.basepath, title)
+
+
+def compress_changed(args, state, jobs=1):
+    outputs = sorted(state.live_outputs())
+    if args.gzip is None:
+        remove_outdated(outputs)
+        return
+    rejected = state.manifest.uncompressed
+    for path in set(rejected).difference(outputs):
+        del rejected[path]
+    compressed = compress_outputs(outputs, args.gzip, jobs, rejected)
+    if compressed:
+        print(f"Compressed {len(compressed)} files")
+
+
+def warn_broken_links(graph, path):
+    for page in graph.referencing(path):
+        print(f"Warning: {page} links to removed {path}")
+
+
+def print_affected(graph, path):
+    outputs = graph.affected(path)
+    if not outputs and path not in graph:
+        print(f"No recorded outputs depend on {path}")
+        return
+    for dest in outputs:
+        print(f"rebuild {dest}")
+    for page in graph.referencing(path):
+        print(f"linked from {page}")
+
+
+def is_site_path(path):
+    return (
+        path == TEMPLATE_PATH
+        or is_inside(path, CONTENT_DIR)
+        or is_inside(path, STATIC_DIR)
+    )
+
+
+def is_inside(path, directory):
+    return os.path.commonpath([path, directory]) == directory
+
+
+def page_dest(from_path, dir_path_content, dest_dir_path):
+    relative_dir = os.path.relpath(os.path.dirname(from_path), dir_path_content)
+    new_file = pathlib.Path(from_path).stem + ".html"
+    return os.path.normpath(os.path.join(dest_dir_path, relative_dir, new_file))
+
+
+def collect_pages(dir_path_content, dest_dir_path):
+    pages = []
     for item in os.listdir(dir_path_content):
         absolute_path = os.path.join(dir_path_content, item)
         is_file = os.path.isfile(absolute_path)
         if is_file:
             new_file = pathlib.Path(absolute_path).stem + ".html"
-            dest_path = os.path.join(dest_dir_path, new_file)
-            generate_page(absolute_path, template_path, dest_path, basepath)
+            pages.append((absolute_path, os.path.join(dest_dir_path, new_file)))
         else:
-            new_absolute_path = os.path.join(dir_path_content, item)
             new_dest_dir_path = os.path.join(dest_dir_path, item)
-            generate_page_recursive(
-                new_absolute_path, template_path, new_dest_dir_path, basepath
-            )
+            pages.extend(collect_pages(absolute_path, new_dest_dir_path))
+    return pages
+
+
+def generate_page(from_path, renderer, dest_path, state=None):
+    if state is None:
+        state = BuildState()
+    if renderer.should_stream(from_path):
+        generate_streamed_page(from_path, renderer, dest_path, state)
+        return
+    page_profile = state.page_profile(from_path)
+    with stage(page_profile, "read"):
+        md, source_hash = read_page(from_path)
+    if state.is_fresh(from_path, source_hash, dest_path):
+        return
+    print(
+        f"Generating page from {from_path} to {dest_path} using template {renderer.template.path}"
+    )
+    block_nodes = renderer.parse(md, source_hash, page_profile)
+    if page_profile is None:
+        with open_if_changed(dest_path) as f:
+            renderer.write(f, md, block_nodes)
+    else:
+        # serialization and writing are timed separately, so no streaming
+        html = renderer.render(md, block_nodes, page_profile)
+        with page_profile.stage("write"):
+            write_page(dest_path, html)
+    facts = state.new_facts()
+    facts.title = page_title(md)
+    for block_node in block_nodes:
+        facts.add(block_node)
+    inputs = [from_path, renderer.template.path]
+    state.record(from_path, source_hash, dest_path, inputs, facts, page_profile)
 
 
-def generate_page(from_path, template_path, dest_path, basepath):
+def generate_streamed_page(from_path, renderer, dest_path, state):
+    # the page is never in memory as a whole: blocks are parsed and written
+    # out as the file is read, and it bypasses the parsed page cache
+    page_profile = state.page_profile(from_path)
+    with stage(page_profile, "read"):
+        source_hash = hash_file(from_path)
+    if state.is_fresh(from_path, source_hash, dest_path):
+        return
     print(
-        f"Generating page from {from_path} to {dest_path} using template {template_path}"
+        f"Generating page from {from_path} to {dest_path} using template {renderer.template.path}"
     )
+    facts = state.new_facts()
+    # reading, parsing, rendering and writing are interleaved, so the whole
+    # time goes to the write stage
+    with stage(page_profile, "write"):
+        with open(from_path, "r") as src, open_if_changed(dest_path) as f:
+            fields, lines = split_front_matter_lines(src)
+            facts.title = renderer.write_streamed(
+                f, iter_blocks(lines), facts.add, fields.get("title")
+            )
+    if page_profile is not None:
+        page_profile.output_bytes = os.path.getsize(dest_path)
+    inputs = [from_path, renderer.template.path]
+    state.record(from_path, source_hash, dest_path, inputs, facts, page_profile)
+
+
+def generate_pages_parallel(pages, renderer, jobs, state=None):
+    if state is None:
+        state = BuildState()
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(renderer, state.profile is not None, state.search is not None),
+    ) as executor:
+        futures = {}
+        for from_path, dest_path in pages:
+            if renderer.should_stream(from_path):
+                # too large to send to a worker
+                generate_streamed_page(from_path, renderer, dest_path, state)
+                continue
+            page_profile = state.page_profile(from_path)
+            with stage(page_profile, "read"):
+                md, source_hash = read_page(from_path)
+            if state.is_fresh(from_path, source_hash, dest_path):
+                continue
+            print(
+                f"Generating page from {from_path} to {dest_path} using template {renderer.template.path}"
+            )
+            future = executor.submit(_render_in_worker, md, source_hash)
+            futures[future] = (from_path, dest_path, source_hash, page_profile)
+        for future in as_completed(futures):
+            from_path, dest_path, source_hash, page_profile = futures[future]
+            html, facts, worker_profile = future.result()
+            with stage(page_profile, "write"):
+                write_page(dest_path, html)
+            if page_profile is not None:
+                page_profile.merge(worker_profile)
+            inputs = [from_path, renderer.template.path]
+            state.record(from_path, source_hash, dest_path, inputs, facts, page_profile)
+
+
+_worker_state = {}
+
+
+def _init_worker(renderer, profile, index_terms):
+    _worker_state["renderer"] = renderer
+    _worker_state["profile"] = profile
+    _worker_state["index_terms"] = index_terms
+
+
+def _render_in_worker(md, source_hash):
+    page_profile = PageProfile(None) if _worker_state["profile"] else None
+    renderer = _worker_state["renderer"]
+    block_nodes = renderer.parse(md, source_hash, page_profile)
+    html = renderer.render(md, block_nodes, page_profile)
+    facts = PageFacts.from_block_nodes(block_nodes, _worker_state["index_terms"])
+    facts.title = page_title(md)
+    return html, facts, page_profile
+
+
+def read_page(from_path):
     md = ""
     with open(from_path, "r") as f:
         md = f.read()
-    template = ""
-    with open(template_path, "r") as f:
-        template = f.read()
-    html_node = markdown_to_html_node(md)
-    html = html_node.to_html()
-    title = extract_title(md)
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
-    template = template.replace('href="/', f'href="{basepath}')
-    template = template.replace('src="/', f'src="{basepath}')
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, "w") as f:
-        f.write(template)
+    return md, hash_bytes(md.encode())
+
+
+def write_page(dest_path, html):
+    return write_if_changed(dest_path, html.encode())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+import itertools
+
+from markdown.parse_block_markdown import extract_title, iter_blocks
+
+# front matter: "key: value" lines between two "---" lines at the very top
+# of a page, e.g.
+#   ---
+#   title: Why Tom Bombadil Was a Mistake
+#   date: 2024-05-01
+#   tags: [tolkien, opinion]
+#   ---
+FRONT_MATTER_DELIMITER = "---"
+# how much of a page read_metadata looks at; a front matter block must
+# also close within this many characters, so finding out that a page has
+# none never means scanning all of it
+MAX_HEAD_BYTES = 4096
+
+
+def parse_front_matter(lines):
+    fields = {}
+    for line in lines:
+        key, separator, value = line.partition(":")
+        if not separator or not key.strip():
+            continue
+        fields[key.strip().lower()] = value.strip().strip("\"'")
+    if "tags" in fields:
+        fields["tags"] = parse_tags(fields["tags"])
+    return fields
+
+
+def parse_tags(value):
+    # "[a, b]" or "a, b"
+    value = value.strip().removeprefix("[").removesuffix("]")
+    return [tag.strip().strip("\"'") for tag in value.split(",") if tag.strip()]
+
+
+def split_front_matter(markdown):
+    # returns the front matter fields and the markdown after them; a page
+    # without a closed front matter block is returned whole
+    if not markdown.startswith(FRONT_MATTER_DELIMITER + "\n"):
+        return {}, markdown
+    start = len(FRONT_MATTER_DELIMITER) + 1
+    closing = f"\n{FRONT_MATTER_DELIMITER}\n"
+    end = markdown.find(closing, start - 1, MAX_HEAD_BYTES + len(closing))
+    if end == -1:
+        if not markdown.endswith(f"\n{FRONT_MATTER_DELIMITER}"):
+            return {}, markdown
+        end = len(markdown) - len(FRONT_MATTER_DELIMITER) - 1
+    if end + 1 > MAX_HEAD_BYTES:
+        return {}, markdown
+    fields = parse_front_matter(markdown[start:end].split("\n"))
+    return fields, markdown[end + len(FRONT_MATTER_DELIMITER) + 2 :]
+
+
+def split_front_matter_lines(lines):
+    # the same for an iterable of lines, such as an open file: returns the
+    # fields and an iterator over the remaining lines
+    lines = iter(lines)
+    first = next(lines, "")
+    if first.rstrip("\n") != FRONT_MATTER_DELIMITER:
+        return {}, itertools.chain([first], lines)
+    head = []
+    size = len(first)
+    for line in lines:
+        if size > MAX_HEAD_BYTES:
+            # no front matter: give back the bounded head already read
+            return {}, itertools.chain([first, *head, line], lines)
+        if line.rstrip("\n") == FRONT_MATTER_DELIMITER:
+            return parse_front_matter(text.rstrip("\n") for text in head), lines
+        head.append(line)
+        size += len(line)
+    return {}, iter([first, *head])
+
+
+def page_title(markdown):
+    # the front matter title, else the first heading
+    fields, body = split_front_matter(markdown)
+    return fields.get("title") or first_heading(body)
+
+
+def first_heading(body):
+    # blank lines may separate the front matter from the heading
+    return extract_title(next(iter_blocks(body.split("\n")), ""))
+
+
+def read_metadata(path, max_bytes=MAX_HEAD_BYTES):
+    # title, date and tags of a page from at most max_bytes of its head,
+    # without parsing the body; fields that are not found are None
+    with open(path, "rb") as f:
+        head = f.read(max_bytes).decode("utf-8", errors="ignore")
+    fields, body = split_front_matter(head)
+    if not fields.get("title"):
+        try:
+            fields["title"] = first_heading(body)
+        except Exception:
+            fields["title"] = None
+    fields.setdefault("date", None)
+    fields.setdefault("tags", [])
+    return fields
@@ -1,5 +1,4 @@
 import enum
-from functools import reduce
 import re
 
 from markdown.parse_inline_markdown import text_to_textnodes
@@ -8,12 +7,33 @@ from node.textnode import TextNode, TextType
 
 
 def markdown_to_blocks(markdown):
-    return list(
-        filter(
-            lambda block: block != "",
-            map(lambda block: block.strip(), markdown.split("\n\n")),
-        )
-    )
+    return list(iter_blocks(markdown.split("\n")))
+
+
+def iter_blocks(lines):
+    # yields the stripped, non-empty blocks between empty lines as each one
+    # completes; lines may keep their line break, so an open file works.
+    # Empty lines inside a ``` fence that opens a block do not end it.
+    block = []
+    started = False
+    in_fence = False
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line and not in_fence:
+            if started:
+                yield "\n".join(block).strip()
+                started = False
+            block = []
+            continue
+        if line.strip() == "```":
+            if in_fence:
+                in_fence = False
+            elif not started:
+                in_fence = True
+        block.append(line)
+        started = started or not line.isspace()
+    if started:
+        yield "\n".join(block).strip()
 
 
 def get_match_pattern(block_type):
@@ -55,111 +75,103 @@ def extract_markdown(block, block_type):
     return re.findall(get_match_pattern(block_type), block)
 
 
-def block_to_block_type(block):
-    def true_for_all_line(test_function, block):
-        return reduce(
-            lambda acc, curr: acc and test_function(curr), block.split("\n"), True
+HEADING_PATTERN = re.compile(r"(#{1,6}) (.*)")
+HEADING_TYPES = (
+    BlockType.HEADING_1,
+    BlockType.HEADING_2,
+    BlockType.HEADING_3,
+    BlockType.HEADING_4,
+    BlockType.HEADING_5,
+    BlockType.HEADING_6,
+)
+QUOTE_LINE_PATTERN = re.compile(r"> ?(.*)")
+UNORDERED_LIST_LINE_PATTERN = re.compile(r"- ?(.*)")
+ORDERED_LIST_LINE_PATTERN = re.compile(r"(\d+)\. ?(.*)")
+
+
+def classify_block(block):
+    # returns the block type with the captures extract_markdown would give:
+    # the heading text, the code body, or the text of every quote/list line
+    first = block[:1]
+    if first == "#":
+        match = HEADING_PATTERN.match(block)
+        if match is None:
+            return BlockType.PARAGRAPH, []
+        return HEADING_TYPES[len(match.group(1)) - 1], [match.group(2)]
+    if first == ">":
+        return classify_lines(block, BlockType.QUOTE, QUOTE_LINE_PATTERN)
+    if first == "-":
+        return classify_lines(
+            block, BlockType.UNORDERED_LIST, UNORDERED_LIST_LINE_PATTERN
         )
+    if first.isdigit():
+        return classify_lines(block, BlockType.ORDERED_LIST, ORDERED_LIST_LINE_PATTERN)
+    if match_markdown(block, BlockType.CODE):
+        return BlockType.CODE, [extract_markdown(block, BlockType.CODE)]
+    return BlockType.PARAGRAPH, []
 
-    if match_markdown(block, BlockType.HEADING_1):
-        return BlockType.HEADING_1
-    elif match_markdown(block, BlockType.HEADING_2):
-        return BlockType.HEADING_2
-    elif match_markdown(block, BlockType.HEADING_3):
-        return BlockType.HEADING_3
-    elif match_markdown(block, BlockType.HEADING_4):
-        return BlockType.HEADING_4
-    elif match_markdown(block, BlockType.HEADING_5):
-        return BlockType.HEADING_5
-    elif match_markdown(block, BlockType.HEADING_6):
-        return BlockType.HEADING_6
-    elif match_markdown(block, BlockType.CODE):
-        return BlockType.CODE
-    elif true_for_all_line(lambda line: match_markdown(line, BlockType.QUOTE), block):
-        return BlockType.QUOTE
-    elif true_for_all_line(
-        lambda line: match_markdown(line, BlockType.UNORDERED_LIST), block
-    ):
-        return BlockType.UNORDERED_LIST
-    elif true_for_all_line(
-        lambda line: match_markdown(line, BlockType.ORDERED_LIST), block
-    ):
-        return BlockType.ORDERED_LIST
-    else:
-        return BlockType.PARAGRAPH
 
+def classify_lines(block, block_type, pattern):
+    captures = []
+    for line in block.split("\n"):
+        match = pattern.match(line)
+        if match is None:
+            return BlockType.PARAGRAPH, []
+        groups = match.groups()
+        captures.append(groups if len(groups) > 1 else groups[0])
+    return block_type, captures
 
-def block_to_block_node(block):
-    block_type = block_to_block_type(block)
 
-    if block_type in [
-        BlockType.HEADING_1,
-        BlockType.HEADING_2,
-        BlockType.HEADING_3,
-        BlockType.HEADING_4,
-        BlockType.HEADING_5,
-        BlockType.HEADING_6,
-    ]:
-        matches = extract_markdown(block, block_type)
+def block_to_block_type(block):
+    return classify_block(block)[0]
+
+
+def block_to_block_node(block, inline_parser=text_to_textnodes):
+    block_type, captures = classify_block(block)
+
+    if block_type in HEADING_TYPES:
         children = []
-        for text in matches:
-            children.extend(text_to_textnodes(text.strip()))
+        for text in captures:
+            children.extend(inline_parser(text.strip()))
         return BlockNode(children, block_type)
     elif block_type == BlockType.CODE:
-        text = extract_markdown(block, block_type)
-        text = "\n".join([line.lstrip() for line in text.split("\n")])
+        text = "\n".join([line.lstrip() for line in captures[0].split("\n")])
         return BlockNode([TextNode(text, TextType.TEXT)], BlockType.CODE)
     elif block_type == BlockType.QUOTE:
-        text_lines = []
-        for line in block.split("\n"):
-            matches = extract_markdown(line, BlockType.QUOTE)
-            text_lines.extend(matches)
-        block_text = "\n".join(text_lines)
         return BlockNode(
-            text_to_textnodes(block_text),
+            inline_parser("\n".join(captures)),
             BlockType.QUOTE,
         )
     elif block_type == BlockType.UNORDERED_LIST:
-        children = []
-        for line in block.split("\n"):
-            matches = extract_markdown(line, BlockType.UNORDERED_LIST)
-            children.extend(
-                [
-                    BlockNode(
-                        text_to_textnodes(text.strip()),
-                        BlockType.UNORDERED_LIST_ITEM,
-                    )
-                    for text in matches
-                ]
-            )
         return BlockNode(
-            children,
+            [
+                BlockNode(
+                    inline_parser(text.strip()),
+                    BlockType.UNORDERED_LIST_ITEM,
+                )
+                for text in captures
+            ],
             BlockType.UNORDERED_LIST,
         )
     elif block_type == BlockType.ORDERED_LIST:
-        children = []
-        for line in block.split("\n"):
-            matches = extract_markdown(line, BlockType.ORDERED_LIST)
-            children.extend(
-                [
-                    BlockNode(
-                        text_to_textnodes(text.strip()),
-                        BlockType.ORDERED_LIST_ITEM,
-                        {"number": int(number)},
-                    )
-                    for number, text in matches
-                ]
-            )
         return BlockNode(
-            children,
+            [
+                BlockNode(
+                    inline_parser(text.strip()),
+                    BlockType.ORDERED_LIST_ITEM,
+                    {"number": int(number)},
+                )
+                for number, text in captures
+            ],
             BlockType.ORDERED_LIST,
         )
     else:
-        return BlockNode(text_to_textnodes(block.strip()), BlockType.PARAGRAPH)
+        return BlockNode(inline_parser(block.strip()), BlockType.PARAGRAPH)
 
 
 def extract_title(markdown):
-    block = markdown.split("\n\n")[0]
-    if block_to_block_type(block) != BlockType.HEADING_1:
+    block = markdown.partition("\n\n")[0]
+    block_type, captures = classify_block(block)
+    if block_type != BlockType.HEADING_1:
         raise Exception("First block is not a heading")
-    return extract_markdown(block, BlockType.HEADING_1)[0]
+    return captures[0]
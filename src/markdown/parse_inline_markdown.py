@@ -1,5 +1,7 @@
 import re
-from node.textnode import TextNode, TextType
+from collections import OrderedDict
+
+from node.textnode import NEWLINE, TextNode, TextType
 
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -88,16 +90,82 @@ def split_nodes_links(old_nodes):
     return new_nodes
 
 
+# delimiters in the order they used to be split out, which is also their
+# priority: a delimiter cannot close across one with a higher priority
+DELIMITERS = {
+    "**": (0, TextType.BOLD),
+    "*": (1, TextType.ITALIC),
+    "_": (2, TextType.ITALIC),
+    "`": (3, TextType.CODE),
+}
+DELIMITER_PATTERN = re.compile(r"\*\*|[*_`]")
+LINK_OR_IMAGE_PATTERN = re.compile(r"(!?)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
 def text_to_textnodes(text):
     all_nodes = []
     for line in text.split("\n"):
-        nodes = [TextNode(line.strip(), TextType.TEXT)]
-        nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-        nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-        nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-        nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-        nodes = split_nodes_links(nodes)
-        nodes = split_nodes_images(nodes)
-        all_nodes.extend(nodes)
-        all_nodes.append(TextNode("\n", TextType.TEXT))
-    return all_nodes[:-1]
+        tokenize_line(line.strip(), all_nodes)
+        all_nodes.append(NEWLINE)
+    all_nodes.pop()
+    return all_nodes
+
+
+def tokenize_line(line, nodes):
+    open_delimiter = None
+    start = 0
+    for match in DELIMITER_PATTERN.finditer(line):
+        delimiter = match.group()
+        if open_delimiter is None:
+            append_text_with_links(line[start : match.start()], nodes)
+            open_delimiter = delimiter
+        elif delimiter == open_delimiter:
+            if match.start() > start:
+                text_type = DELIMITERS[delimiter][1]
+                nodes.append(TextNode(line[start : match.start()], text_type))
+            open_delimiter = None
+        elif DELIMITERS[delimiter][0] < DELIMITERS[open_delimiter][0]:
+            raise Exception("Unbalanced delimiter")
+        else:
+            # lower priority delimiters inside a span are plain text
+            continue
+        start = match.end()
+    if open_delimiter is not None:
+        raise Exception("Unbalanced delimiter")
+    append_text_with_links(line[start:], nodes)
+
+
+def append_text_with_links(text, nodes):
+    position = 0
+    for match in LINK_OR_IMAGE_PATTERN.finditer(text):
+        if match.start() > position:
+            nodes.append(TextNode(text[position : match.start()], TextType.TEXT))
+        text_type = TextType.IMAGE if match.group(1) else TextType.LINK
+        nodes.append(TextNode(match.group(2), text_type, match.group(3)))
+        position = match.end()
+    if position < len(text):
+        nodes.append(TextNode(text[position:], TextType.TEXT))
+
+
+class InlineCache:
+    # a bounded LRU memo for text_to_textnodes, for text that repeats across
+    # pages; results are tuples so every block sharing one stays unchanged
+    def __init__(self, max_entries, parser=text_to_textnodes):
+        self.max_entries = max_entries
+        self.parser = parser
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, text):
+        nodes = self.entries.get(text)
+        if nodes is not None:
+            self.entries.move_to_end(text)
+            self.hits += 1
+            return nodes
+        self.misses += 1
+        nodes = tuple(self.parser(text))
+        self.entries[text] = nodes
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return nodes
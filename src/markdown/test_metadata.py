@@ -0,0 +1,85 @@
+import io
+import os
+import tempfile
+import unittest
+
+from markdown.metadata import (
+    MAX_HEAD_BYTES,
+    page_title,
+    read_metadata,
+    split_front_matter,
+    split_front_matter_lines,
+)
+
+PAGE = """---
+title: "Tom, again"
+date: 2024-05-01
+tags: [tolkien, opinion]
+---
+# Why Tom Bombadil Was a Mistake
+
+Body text
+"""
+
+
+class TestMetadata(unittest.TestCase):
+    def test_split_front_matter(self):
+        fields, body = split_front_matter(PAGE)
+        self.assertEqual(
+            fields,
+            {
+                "title": "Tom, again",
+                "date": "2024-05-01",
+                "tags": ["tolkien", "opinion"],
+            },
+        )
+        self.assertEqual(body, "# Why Tom Bombadil Was a Mistake\n\nBody text\n")
+
+    def test_split_without_front_matter(self):
+        for md in ["# Title\n\n---\nx\n---\n", "---\nnot closed\n"]:
+            self.assertEqual(split_front_matter(md), ({}, md))
+
+    def test_split_lines_matches_split(self):
+        for md in [PAGE, "# Title\n", "---\nnot closed\n", "---\na: b\n---"]:
+            fields, lines = split_front_matter_lines(io.StringIO(md))
+            self.assertEqual((fields, "".join(lines)), split_front_matter(md))
+
+    def test_front_matter_must_close_in_the_head(self):
+        unclosed = "---\n" + "line\n" * 100000 + "# Title\n"
+        late = "---\n" + "x: y\n" * 1000 + "---\n# Title\n"
+        for md in [unclosed, late]:
+            self.assertEqual(split_front_matter(md), ({}, md))
+            lines = io.StringIO(md)
+            fields, rest = split_front_matter_lines(lines)
+            self.assertEqual(fields, {})
+            # only a bounded head was read ahead
+            self.assertLess(lines.tell(), MAX_HEAD_BYTES + 100)
+            self.assertEqual("".join(rest), md)
+
+    def test_page_title(self):
+        self.assertEqual(page_title(PAGE), "Tom, again")
+        self.assertEqual(page_title("---\ndate: 1\n---\n# Heading\n"), "Heading")
+        self.assertEqual(page_title("---\ndate: 1\n---\n\n# Heading\n"), "Heading")
+
+    def test_read_metadata_reads_only_the_head(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w") as f:
+                f.write("# Just a heading\n\n" + "x" * 100000)
+            self.assertEqual(
+                read_metadata(path, max_bytes=64),
+                {"title": "Just a heading", "date": None, "tags": []},
+            )
+            with open(path, "w") as f:
+                f.write(PAGE)
+            self.assertEqual(read_metadata(path)["tags"], ["tolkien", "opinion"])
+            with open(path, "w") as f:
+                f.write("---\ndate: 2024-05-01\n---\n\n# After a blank line\n")
+            self.assertEqual(read_metadata(path)["title"], "After a blank line")
+            with open(path, "w") as f:
+                f.write("no heading")
+            self.assertIsNone(read_metadata(path)["title"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,16 @@
+import random
 import unittest
 
 from markdown.parse_block_markdown import (
     BlockType,
     block_to_block_node,
     block_to_block_type,
+    classify_block,
+    extract_markdown,
     extract_title,
+    iter_blocks,
     markdown_to_blocks,
+    match_markdown,
 )
 from node.blocknode import BlockNode
 from node.textnode import TextNode, TextType
@@ -43,6 +48,28 @@ This is the same paragraph on a new line
         blocks = markdown_to_blocks(markdown)
         self.assertEqual(blocks, ["Text surrounded by space"])
 
+    def test_markdown_to_blocks_fenced_code_with_empty_lines(self):
+        markdown = "Text\n\n```\nfirst\n\n\nsecond\n```\n\nMore ```\n\n```"
+        blocks = markdown_to_blocks(markdown)
+        self.assertEqual(
+            blocks, ["Text", "```\nfirst\n\n\nsecond\n```", "More ```", "```"]
+        )
+        self.assertEqual(block_to_block_type(blocks[1]), BlockType.CODE)
+
+    def test_iter_blocks_from_file_lines(self):
+        lines = ["# Title\n", "\n", "a\n", "b\n", "\n", "\n", "  c  \n"]
+        self.assertEqual(list(iter_blocks(lines)), ["# Title", "a\nb", "c"])
+
+    def test_markdown_to_blocks_matches_split(self):
+        rng = random.Random(4321)
+        pieces = ["word", " ", "  ", "\n", "\n\n", "\n\n\n", "- item", "\t"]
+        for _ in range(3000):
+            markdown = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            with self.subTest(markdown=markdown):
+                self.assertEqual(
+                    markdown_to_blocks(markdown), split_markdown_to_blocks(markdown)
+                )
+
     # endregion
     # region block_to_block_type
     def test_block_to_block_type_heading(self):
@@ -121,6 +148,51 @@ This is the same paragraph on a new line
         block = ""
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_block_to_block_type_heading_too_deep(self):
+        block = "####### This is not a heading"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+    # endregion
+    # region classify_block
+    def test_classify_block_captures(self):
+        self.assertEqual(
+            classify_block("### Heading\nnext line"),
+            (BlockType.HEADING_3, ["Heading"]),
+        )
+        self.assertEqual(
+            classify_block("```\ncode\n  more\n```"),
+            (BlockType.CODE, ["code\n  more"]),
+        )
+        self.assertEqual(
+            classify_block("> one\n>two\n>"),
+            (BlockType.QUOTE, ["one", "two", ""]),
+        )
+        self.assertEqual(
+            classify_block("- a\n-b"), (BlockType.UNORDERED_LIST, ["a", "b"])
+        )
+        self.assertEqual(
+            classify_block("1. a\n22.b"),
+            (BlockType.ORDERED_LIST, [("1", "a"), ("22", "b")]),
+        )
+        self.assertEqual(classify_block("- a\nb"), (BlockType.PARAGRAPH, []))
+
+    def test_classify_block_matches_pattern_chain(self):
+        rng = random.Random(1234)
+        pieces = ["#", "# ", "## ", "> ", ">", "- ", "-", "1. ", "12.", "```"]
+        pieces += ["word", " ", "\n", "  ```"]
+        for _ in range(3000):
+            block = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 8)))
+            with self.subTest(block=block):
+                block_type = pattern_chain_block_type(block)
+                captures = []
+                if block_type == BlockType.CODE:
+                    captures = [extract_markdown(block, block_type)]
+                elif block_type != BlockType.PARAGRAPH:
+                    lines = [block] if block.startswith("#") else block.split("\n")
+                    for line in lines:
+                        captures.extend(extract_markdown(line, block_type))
+                self.assertEqual(classify_block(block), (block_type, captures))
+
     # endregion
     # region block_to_block_node
     def test_block_to_block_node_empty(self):
@@ -336,5 +408,34 @@ This is the same paragraph on a new line
     # endregion
 
 
+def split_markdown_to_blocks(markdown):
+    # the original splitter, which ignores code fences, kept as a reference
+    blocks = [block.strip() for block in markdown.split("\n\n")]
+    return [block for block in blocks if block != ""]
+
+
+def pattern_chain_block_type(block):
+    # the original classifier, trying every pattern in turn, kept as a reference
+    for block_type in [
+        BlockType.HEADING_1,
+        BlockType.HEADING_2,
+        BlockType.HEADING_3,
+        BlockType.HEADING_4,
+        BlockType.HEADING_5,
+        BlockType.HEADING_6,
+        BlockType.CODE,
+    ]:
+        if match_markdown(block, block_type):
+            return block_type
+    for block_type in [
+        BlockType.QUOTE,
+        BlockType.UNORDERED_LIST,
+        BlockType.ORDERED_LIST,
+    ]:
+        if all(match_markdown(line, block_type) for line in block.split("\n")):
+            return block_type
+    return BlockType.PARAGRAPH
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,8 @@
+import random
 import unittest
 
 from markdown.parse_inline_markdown import (
+    InlineCache,
     extract_markdown_images,
     extract_markdown_links,
     split_nodes_delimiter,
@@ -249,4 +251,88 @@ class TestSplitNode(unittest.TestCase):
         nodes = text_to_textnodes(text)
         self.assertListEqual(expected_nodes, nodes)
 
+    def test_text_to_textnodes_multiline(self):
+        text = "  **bold** line  \n\n_second_ [line](/x)"
+        expected_nodes = [
+            TextNode("bold", TextType.BOLD),
+            TextNode(" line", TextType.TEXT),
+            TextNode("\n", TextType.TEXT),
+            TextNode("\n", TextType.TEXT),
+            TextNode("second", TextType.ITALIC),
+            TextNode(" ", TextType.TEXT),
+            TextNode("line", TextType.LINK, "/x"),
+        ]
+
+        nodes = text_to_textnodes(text)
+        self.assertListEqual(expected_nodes, nodes)
+
+    def test_text_to_textnodes_unbalanced(self):
+        for text in ["**bold", "*a **b** c*", "`a*b`", "a_b"]:
+            with self.assertRaises(Exception):
+                text_to_textnodes(text)
+
+    # endregion
+    # region differential
+    def test_text_to_textnodes_matches_split_passes(self):
+        rng = random.Random(1234)
+        pieces = ["word", " ", "**", "*", "_", "`", "!", "[", "]", "(", ")"]
+        for i in range(3000):
+            parts = []
+            for j in range(rng.randint(0, 12)):
+                if rng.random() < 0.15:
+                    # unique urls: the split passes mis-split duplicated links
+                    bang = rng.choice(["", "!"])
+                    parts.append(f"{bang}[{rng.choice(pieces)}](/u{i}-{j})")
+                else:
+                    parts.append(rng.choice(pieces + ["\n"]))
+            text = "".join(parts)
+            with self.subTest(text=text):
+                try:
+                    expected = split_passes_text_to_textnodes(text)
+                except Exception:
+                    with self.assertRaises(Exception):
+                        text_to_textnodes(text)
+                    continue
+                self.assertListEqual(expected, text_to_textnodes(text))
+
+    # endregion
+    # region InlineCache
+    def test_inline_cache_reuses_nodes(self):
+        cache = InlineCache(10)
+        nodes = cache("Read **more**")
+        self.assertIsInstance(nodes, tuple)
+        self.assertListEqual(list(nodes), text_to_textnodes("Read **more**"))
+        self.assertIs(cache("Read **more**"), nodes)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_inline_cache_evicts_least_recently_used(self):
+        cache = InlineCache(2)
+        cache("a")
+        cache("b")
+        cache("a")
+        cache("c")
+        self.assertEqual(list(cache.entries), ["a", "c"])
+
+    def test_inline_cache_does_not_cache_errors(self):
+        cache = InlineCache(2)
+        with self.assertRaises(Exception):
+            cache("**open")
+        self.assertEqual(len(cache.entries), 0)
+
     # endregion
+
+
+def split_passes_text_to_textnodes(text):
+    # the original multi-pass implementation, kept as a reference
+    all_nodes = []
+    for line in text.split("\n"):
+        nodes = [TextNode(line.strip(), TextType.TEXT)]
+        nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+        nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+        nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+        nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+        nodes = split_nodes_links(nodes)
+        nodes = split_nodes_images(nodes)
+        all_nodes.extend(nodes)
+        all_nodes.append(TextNode("\n", TextType.TEXT))
+    return all_nodes[:-1]
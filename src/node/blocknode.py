@@ -18,9 +18,13 @@ class BlockType(Enum):
 
 
 class BlockNode:
+    __slots__ = ("children", "block_type", "props")
+
     def __init__(self, children, block_type, props=None):
         self.children = children
-        self.block_type = BlockType(block_type)
+        self.block_type = (
+            block_type if isinstance(block_type, BlockType) else BlockType(block_type)
+        )
         self.props = props
 
     def __eq__(self, other):
@@ -11,9 +11,18 @@ def text_to_children(text):
     text_to_textnodes(text)
 
 
-def markdown_to_html_node(markdown):
+def markdown_to_block_nodes(markdown, inline_parser=text_to_textnodes):
     blocks = markdown_to_blocks(markdown)
-    blockNodes = [block_to_block_node(block) for block in blocks]
-    htmlNodes = [block_node_to_html_node(blockNode) for blockNode in blockNodes]
+    return [block_to_block_node(block, inline_parser) for block in blocks]
+
+
+def block_nodes_to_html_node(blockNodes, rewrite_url=None):
+    htmlNodes = [
+        block_node_to_html_node(blockNode, rewrite_url) for blockNode in blockNodes
+    ]
 
     return ParentNode("div", children=htmlNodes)
+
+
+def markdown_to_html_node(markdown):
+    return block_nodes_to_html_node(markdown_to_block_nodes(markdown))
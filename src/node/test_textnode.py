@@ -1,6 +1,6 @@
 import unittest
 
-from node.textnode import TextNode, TextType
+from node.textnode import NEWLINE, TextNode, TextType
 
 
 class TestTextNode(unittest.TestCase):
@@ -35,6 +35,15 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a link node", TextType.LINK, "url/2")
         self.assertNotEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = True
+
+    def test_newline(self):
+        self.assertEqual(NEWLINE, TextNode("\n", TextType.TEXT))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -11,9 +11,13 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
-        self.text_type = TextType(text_type)
+        self.text_type = (
+            text_type if isinstance(text_type, TextType) else TextType(text_type)
+        )
         self.url = url
 
     def __eq__(self, other):
@@ -25,5 +29,15 @@ class TextNode:
             and self.url == other.url
         )
 
+    def __reduce__(self):
+        # unpickles the shared line break as the module's NEWLINE again
+        if self is NEWLINE:
+            return "NEWLINE"
+        return (TextNode, (self.text, self.text_type, self.url))
+
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
+
+
+# one shared node for every line break; nodes are never modified after parsing
+NEWLINE = TextNode("\n", TextType.TEXT)
@@ -0,0 +1,239 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import main
+from build.depgraph import DependencyGraph
+from build.manifest import Manifest
+from build.server import is_serving, send_request
+from build.state import BuildState
+
+
+class SiteTestCase(unittest.TestCase):
+    # runs in a temporary directory holding a small site
+    FILES = {
+        "content/index.md": "# Home\n\n[a](/a)\n",
+        "content/a/index.md": "# A\n\ntext\n",
+        "template.html": "<title>{{ Title }}</title>{{ Content }}",
+    }
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        for path, text in self.FILES.items():
+            self.write(path, text)
+        os.makedirs("static", exist_ok=True)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self, argv):
+        args = main.parse_args(argv)
+        state = BuildState(Manifest.load(), DependencyGraph.load(main.DEST_DIR))
+        with contextlib.redirect_stdout(io.StringIO()):
+            renderer = main.build(args, state)
+        return args, state, renderer
+
+
+class TestParallelBuild(SiteTestCase):
+    FILES = {
+        **SiteTestCase.FILES,
+        **{
+            f"content/blog/post{i}/index.md": f"# Post {i}\n\n"
+            f"Some **bold** text and [home](/) ![pic](/images/a.png)\n\n"
+            f"```\ncode {i}\n```\n\n- one\n- two\n"
+            for i in range(12)
+        },
+        "static/images/a.png": "png",
+    }
+
+    def snapshot(self):
+        files = {}
+        for dirpath, _, filenames in os.walk(main.DEST_DIR):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as f:
+                    files[path] = f.read()
+        with open(main.MANIFEST_PATH) as f:
+            manifest = json.load(f)
+        with open(main.GRAPH_PATH) as f:
+            graph = json.load(f)
+        return files, manifest, graph
+
+    def test_parallel_build_matches_serial(self):
+        self.build(["-j", "1"])
+        serial = self.snapshot()
+        shutil.rmtree(main.DEST_DIR)
+        shutil.rmtree(".build_cache")
+        self.build(["-j", "2"])
+        parallel = self.snapshot()
+        self.assertEqual(len(serial[0]), 15)
+        self.assertEqual(parallel, serial)
+
+
+class FakeWatcher:
+    # each batch: the files to write, then the paths reported as changed
+    def __init__(self, test, batches):
+        self.test = test
+        self.batches = list(batches)
+        self.closed = False
+
+    def wait(self):
+        if not self.batches:
+            raise KeyboardInterrupt
+        edits, changed = self.batches.pop(0)
+        for path, text in edits.items():
+            self.test.write(path, text)
+        return changed
+
+    def close(self):
+        self.closed = True
+
+
+class TestWatch(SiteTestCase):
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_failed_page_keeps_the_new_template(self):
+        args, state, renderer = self.build([])
+        page = "content/a/index.md"
+        watcher = FakeWatcher(
+            self,
+            [
+                (
+                    {page: "# A\n\n**broken\n", "template.html": "<h>{{ Content }}"},
+                    {page, "template.html"},
+                ),
+                ({page: "# A\n\nfixed\n"}, {page}),
+            ],
+        )
+        rebuild = main.rebuild
+        calls = []
+
+        def checked_rebuild(*call_args):
+            renderer = rebuild(*call_args)
+            calls.append(
+                (
+                    self.read("docs/index.html"),
+                    self.read("docs/a/index.html"),
+                    dict(state.failed),
+                    Manifest.load().pages[page]["hash"],
+                )
+            )
+            return renderer
+
+        output = io.StringIO()
+        with mock.patch.object(
+            main, "create_watcher", return_value=watcher
+        ), mock.patch.object(
+            main, "rebuild", checked_rebuild
+        ), contextlib.redirect_stdout(
+            output
+        ):
+            main.watch(args, state, renderer)
+        (home, a, failed, saved_hash), (_, fixed, refailed, _) = calls
+        # the other pages got the new template, the broken one is stale
+        self.assertTrue(home.startswith("<h>"))
+        self.assertIn("<title>A</title>", a)
+        self.assertEqual(failed, {page: "Exception: Unbalanced delimiter"})
+        self.assertIsNone(saved_hash)
+        self.assertIn(
+            f"Rebuild of {page} failed: Exception: Unbalanced delimiter",
+            output.getvalue(),
+        )
+        # once fixed, it is rendered with the new template too
+        self.assertTrue(fixed.startswith("<h>"))
+        self.assertIn("fixed", fixed)
+        self.assertEqual(refailed, {})
+        self.assertTrue(watcher.closed)
+
+
+class TestServe(SiteTestCase):
+    def test_template_change_reuses_parsed_pages(self):
+        args = main.parse_args(["--serve"])
+        state = BuildState(Manifest.load(), DependencyGraph.load(main.DEST_DIR))
+        with contextlib.redirect_stdout(io.StringIO()):
+            renderer = main.build(args, state)
+            with open(main.TEMPLATE_PATH, "w") as f:
+                f.write("<h1>{{ Title }}</h1>{{ Content }}")
+            with mock.patch("build.astcache.pickle.load") as load:
+                renderer = main.rebuild({main.TEMPLATE_PATH}, args, state, renderer)
+        load.assert_not_called()
+        self.assertEqual(renderer.ast_cache.hits, 2)
+        with open(os.path.join(main.DEST_DIR, "a", "index.html")) as f:
+            self.assertTrue(f.read().startswith("<h1>A</h1>"))
+
+    @contextlib.contextmanager
+    def serving(self):
+        args = main.parse_args(["--serve", os.path.join(self.tmp.name, "build.sock")])
+        state = BuildState(Manifest.load(), DependencyGraph.load(main.DEST_DIR))
+        with contextlib.redirect_stdout(io.StringIO()):
+            renderer = main.build(args, state)
+            thread = threading.Thread(target=main.serve, args=(args, state, renderer))
+            thread.start()
+            try:
+                while thread.is_alive() and not is_serving(args.serve):
+                    thread.join(0.01)
+                yield lambda request: send_request(request, args.serve)
+            finally:
+                send_request({"command": "stop"}, args.serve)
+                thread.join()
+
+    def test_serve_rebuilds_requested_paths(self):
+        with self.serving() as send:
+            page = os.path.abspath(os.path.join("content", "a", "index.md"))
+            with open(page, "a") as f:
+                f.write("more\n")
+            response = send({"command": "rebuild", "paths": [page]})
+            self.assertTrue(response["ok"])
+            self.assertEqual(response["rendered"], 1)
+            outside = os.path.abspath("notes.md")
+            response = send({"command": "rebuild", "paths": [page, outside]})
+            self.assertFalse(response["ok"])
+            self.assertIn(outside, response["error"])
+
+    def test_failed_page_keeps_the_new_template(self):
+        page = os.path.join("content", "a", "index.md")
+        changed = [os.path.abspath(page), os.path.abspath(main.TEMPLATE_PATH)]
+        with self.serving() as send:
+            self.write(page, "# A\n\n**broken\n")
+            self.write(main.TEMPLATE_PATH, "<h>{{ Content }}")
+            response = send({"command": "rebuild", "paths": changed})
+            self.assertFalse(response["ok"])
+            self.assertIn(page, response["error"])
+            with open(os.path.join(main.DEST_DIR, "index.html")) as f:
+                self.assertTrue(f.read().startswith("<h>"))
+            self.write(page, "# A\n\nfixed\n")
+            response = send({"command": "rebuild", "paths": changed[:1]})
+            self.assertTrue(response["ok"])
+            with open(os.path.join(main.DEST_DIR, "a", "index.html")) as f:
+                self.assertTrue(f.read().startswith("<h>"))
+
+
+class TestParseArgs(unittest.TestCase):
+    def test_shard_rejects_whole_site_modes(self):
+        self.assertEqual(main.parse_args(["--shard", "1/2"]).shard, (1, 2))
+        for flag in ["--search", "--watch", "--serve"]:
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(
+                io.StringIO()
+            ):
+                main.parse_args(["--shard", "1/2", flag])
+
+
+if __name__ == "__main__":
+    unittest.main()